@@ -0,0 +1,83 @@
+"""Compare database size and load time of base64 text vs binary ciphertext storage.
+
+Builds a notebook in the legacy text format, measures it, migrates it in
+place through Alembic and measures it again:
+
+    python -m benchmarks.storage_format --blocks 10000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from src.core.blockchain.block import Block
+from src.core.crypto.aes_handler import AESHandler
+from src.core.database.session import DatabaseManager
+
+def build_legacy_database(path: str, crypto: AESHandler, blocks: int, note_size: int):
+    """Write a chain the way the text-column schema stored it"""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE blocks (id INTEGER NOT NULL PRIMARY KEY, "index" INTEGER NOT NULL UNIQUE, '
+        'timestamp DATETIME NOT NULL, encrypted_data TEXT NOT NULL, '
+        'previous_hash VARCHAR(64) NOT NULL, current_hash VARCHAR(64) NOT NULL UNIQUE)'
+    )
+    previous_hash = "0"
+    rows = []
+    for index in range(blocks):
+        timestamp = datetime.utcnow()
+        data = {"note": "Genesis Block"} if index == 0 else {"content": "x" * note_size, "created_at": str(timestamp)}
+        encrypted = crypto.encrypt(json.dumps(data))
+        current_hash = Block.compute_hash(index, timestamp, encrypted, previous_hash)
+        rows.append((index + 1, index, timestamp.isoformat(sep=" "), encrypted, previous_hash, current_hash))
+        previous_hash = current_hash
+    connection.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)", rows)
+    connection.commit()
+    connection.close()
+
+def measure(path: str, crypto: AESHandler) -> dict:
+    """Database size and time to read and decrypt every block"""
+    connection = sqlite3.connect(path)
+    connection.execute("VACUUM")
+    start = time.perf_counter()
+    for (encrypted_data,) in connection.execute('SELECT encrypted_data FROM blocks ORDER BY "index"'):
+        if isinstance(encrypted_data, str):
+            crypto.decrypt(encrypted_data)
+        else:
+            crypto.decrypt_envelope(encrypted_data)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return {"size_bytes": os.path.getsize(path), "load_seconds": round(elapsed, 4)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=10000)
+    parser.add_argument("--note-size", type=int, default=500)
+    args = parser.parse_args()
+
+    crypto = AESHandler(os.urandom(32))
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "notebook.db")
+        build_legacy_database(path, crypto, args.blocks, args.note_size)
+        text_format = measure(path, crypto)
+
+        start = time.perf_counter()
+        DatabaseManager(path).close()
+        migration_seconds = time.perf_counter() - start
+        binary_format = measure(path, crypto)
+
+    print(json.dumps({
+        "blocks": args.blocks,
+        "note_size": args.note_size,
+        "text": text_format,
+        "binary": binary_format,
+        "migration_seconds": round(migration_seconds, 4),
+        "size_ratio": round(binary_format["size_bytes"] / text_format["size_bytes"], 3),
+        "load_ratio": round(binary_format["load_seconds"] / text_format["load_seconds"], 3)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Time the core operations on synthetic notebooks and catch regressions.
+
+Builds a notebook per size in a temporary directory (with a cheap KDF so
+setup takes seconds, not minutes), times each operation, records its
+peak Python memory with tracemalloc and writes the results as JSON:
+
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.suite --save-baseline baseline.json
+    python -m benchmarks.suite --baseline baseline.json --max-slowdown 1.25
+
+With --baseline the run exits with status 1 when an operation is slower
+(or uses more memory) than the baseline by more than the given ratio.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from src.app.services.diary_service import DiaryService
+from src.core.crypto.aes_handler import AESHandler
+from src.core.crypto.key_derivation import derive_key
+from src.core.database.session import DatabaseManager
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_NOTE_SIZE = 500
+CRYPTO_OPERATIONS = 2000
+# Large enough that "auto" and the pools actually spread the work
+DECRYPT_MANY_BLOBS = 20000
+DECRYPT_MANY_BACKENDS = ["inline", "thread", "process", "auto"]
+APPEND_OPERATIONS = 100
+PASSWORD = "benchmark"
+
+def cheap_kdf(password: str, salt: bytes) -> bytes:
+    """Stand-in for PBKDF2 so building a notebook does not pay for key stretching. Never use outside benchmarks."""
+    return (password.encode() + salt + b'\x00' * 32)[:32]
+
+def measure(operation: Callable[[], None], repeat: int = 1, operations: int = 1,
+            setup: Optional[Callable[[], None]] = None, memory: bool = True) -> Dict:
+    """Best wall time per operation over `repeat` runs, plus peak memory of one extra traced run"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    result = {"seconds": min(timings) / operations}
+
+    if memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            operation()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def note_payload(number: int, note_size: int) -> Dict:
+    content = f"Synthetic note {number} " + "lorem ipsum " * (note_size // 12)
+    return {"content": content, "created_at": str(datetime.utcnow())}
+
+def build_notebook(workdir: str, blocks: int, note_size: int) -> DiaryService:
+    """Create a notebook of `blocks` blocks (genesis included)"""
+    db_manager = DatabaseManager(os.path.join(workdir, "notebook.db"), profile="bulk-import")
+    service = DiaryService(PASSWORD, kdf=cheap_kdf, db_manager=db_manager)
+    service.blockchain.add_blocks(note_payload(number, note_size) for number in range(1, blocks))
+    db_manager.use_profile("balanced")
+    return service
+
+def bench_crypto(note_size: int, repeat: int, memory: bool) -> Dict[str, Dict]:
+    """Operations that do not depend on notebook size"""
+    crypto = AESHandler(os.urandom(32))
+    plaintext = json.dumps(note_payload(1, note_size)).encode()
+    envelopes = [crypto.encrypt_envelope(plaintext) for _ in range(CRYPTO_OPERATIONS)]
+
+    def encrypt():
+        for _ in range(CRYPTO_OPERATIONS):
+            crypto.encrypt_envelope(plaintext)
+
+    def decrypt():
+        for envelope in envelopes:
+            crypto.decrypt_envelope(envelope)
+
+    results = {
+        "derive_key": measure(lambda: derive_key(PASSWORD, os.urandom(16)), memory=memory),
+        "encrypt": measure(encrypt, repeat, CRYPTO_OPERATIONS, memory=memory),
+        "decrypt": measure(decrypt, repeat, CRYPTO_OPERATIONS, memory=memory),
+    }
+
+    # A cold load of a large notebook; compare across machines with different core counts
+    many = [crypto.encrypt_envelope(plaintext) for _ in range(DECRYPT_MANY_BLOBS)]
+    for backend in DECRYPT_MANY_BACKENDS:
+        results[f"decrypt_many_{backend}"] = measure(
+            lambda backend=backend: crypto.decrypt_many(many, backend=None if backend == "inline" else backend),
+            repeat, DECRYPT_MANY_BLOBS, memory=memory
+        )
+    return results
+
+def bench_notebook(blocks: int, note_size: int, repeat: int, memory: bool) -> Dict[str, Dict]:
+    """Operations whose cost grows with the notebook"""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        service = build_notebook(workdir, blocks, note_size)
+        results["build"] = {"seconds": time.perf_counter() - start}
+        try:
+            # Cold cache: every run decrypts the whole notebook
+            results["get_all_notes"] = measure(service.get_all_notes, repeat, setup=service.note_cache.clear,
+                                               memory=memory)
+            results["is_chain_valid"] = measure(lambda: service.is_chain_valid(full_audit=True), repeat,
+                                                memory=memory)
+
+            def append():
+                for number in range(APPEND_OPERATIONS):
+                    service.blockchain.add_block(note_payload(number, note_size))
+
+            results["add_block"] = measure(append, repeat, APPEND_OPERATIONS, memory=memory)
+        finally:
+            service.cleanup()
+            service.db_manager.close()
+    return results
+
+def run(sizes: List[int], note_size: int, repeat: int, memory: bool) -> Dict:
+    results = bench_crypto(note_size, repeat, memory)
+    for blocks in sizes:
+        print(f"Benchmarking {blocks} blocks...", file=sys.stderr)
+        for name, result in bench_notebook(blocks, note_size, repeat, memory).items():
+            results[f"{name}[{blocks}]"] = result
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "note_size": note_size,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(current: Dict, baseline: Dict, max_slowdown: float, max_memory_growth: float,
+            only: Optional[List[str]] = None) -> List[str]:
+    """Describe every benchmark that regressed past its threshold"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or (only and name.split("[")[0] not in only):
+            continue
+        checks = [("seconds", max_slowdown), ("peak_bytes", max_memory_growth)]
+        for metric, limit in checks:
+            if metric not in result or not base.get(metric):
+                continue
+            ratio = result[metric] / base[metric]
+            status = "REGRESSION" if ratio > limit else "ok"
+            print(f"{name:28} {metric:10} {base[metric]:>14.6g} -> {result[metric]:>14.6g}  x{ratio:.2f}  {status}",
+                  file=sys.stderr)
+            if ratio > limit:
+                regressions.append(f"{name} {metric} x{ratio:.2f} (limit x{limit})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--note-size", type=int, default=DEFAULT_NOTE_SIZE)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation; the fastest counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--save-baseline", help="also write the results as a baseline file")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    parser.add_argument("--max-memory-growth", type=float, default=1.25)
+    parser.add_argument("--only", nargs="+", help="operations that can fail the run, e.g. get_all_notes is_chain_valid")
+    args = parser.parse_args()
+
+    current = run(args.sizes, args.note_size, args.repeat, not args.no_memory)
+    output = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.max_slowdown, args.max_memory_growth, args.only)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
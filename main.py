@@ -1,9 +1,13 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from src.app.ui.main_window import MainWindow
 import logging
+import os
+from dotenv import load_dotenv
 from logging.handlers import RotatingFileHandler
 
+# Re-run under `-X importtime` and report import times and time to first paint
+PROFILE_FLAG = "--profile-startup"
+PROFILE_CHILD_FLAG = "--profile-startup-child"
+
 def setup_logging():
     """Configure application logging"""
     log_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
@@ -25,11 +29,30 @@ def setup_logging():
     root_logger.addHandler(console_handler)
 
 def main():
+    if PROFILE_FLAG in sys.argv:
+        from src.core.utils.startup_profile import profile_startup
+        sys.exit(profile_startup(os.path.abspath(__file__), [PROFILE_CHILD_FLAG]))
+    profiling = PROFILE_CHILD_FLAG in sys.argv
+    if profiling:
+        from src.core.utils.startup_profile import mark
+        mark("main")
+    
+    # Settings such as CRYPTONOTE_DB_PROFILE may come from a .env file
+    load_dotenv()
     setup_logging()
-    app = QApplication(sys.argv)
+    # Qt is the only heavy import before the first paint; the database and
+    # crypto stack load on the unlock worker thread
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from src.app.ui.main_window import MainWindow
+    if profiling:
+        mark("ui imported")
+    app = QApplication([arg for arg in sys.argv if arg != PROFILE_CHILD_FLAG])
     
     try:
         window = MainWindow()
+        if profiling:
+            mark("window created")
+            watch_first_paint(window)
         window.show()
         sys.exit(app.exec_())
     except Exception as e:
@@ -37,5 +60,20 @@ def main():
         QMessageBox.critical(None, "Fatal Error", 
             f"The application encountered a fatal error:\n{str(e)}")
 
+def watch_first_paint(window):
+    """Report the window's first paint to the profiling parent, then exit"""
+    from PyQt5.QtCore import QObject, QEvent
+    from src.core.utils.startup_profile import mark
+
+    class FirstPaintProbe(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint:
+                mark("first paint")
+                os._exit(0)
+            return False
+
+    window.first_paint_probe = FirstPaintProbe(window)
+    window.installEventFilter(window.first_paint_probe)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
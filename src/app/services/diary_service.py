@@ -1,43 +1,124 @@
 from datetime import datetime
-from typing import List, Dict, Optional
-from src.core.blockchain.chain import Blockchain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from src.core.blockchain.block import Block
+from src.core.blockchain.chain import Blockchain, APPEND_BATCH_SIZE
 from src.core.crypto.aes_handler import AESHandler
 from src.core.crypto.key_derivation import derive_key
-from src.core.database.session import db_manager
-import os
+from src.core.crypto.keystore import KeyStore
+from src.core.metrics import metrics, timed
+from src.core.database.session import DatabaseManager, get_db_manager
+from .note_cache import NoteCache, DEFAULT_CACHE_BYTES
+from .search_index import SearchIndex, SEARCH_LIMIT
+import difflib
 import logging
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+class NoteEvent:
+    """A change to the set of live notes"""
+    ADDED = "added"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    # Too many changes to describe one by one (e.g. an import): reload
+    RELOADED = "reloaded"
+
+    def __init__(self, kind: str, note_id: Optional[int] = None, block_index: Optional[int] = None,
+                 note: Optional[Dict] = None, previous_id: Optional[int] = None,
+                 note_index: Optional[int] = None):
+        self.kind = kind
+        # Stable note ID: the index of the block that created the note
+        self.note_id = note_id
+        # Index of the block that recorded the change; the chain now ends there
+        self.block_index = block_index
+        self.note = note
+        # Block that now holds the note's content (added or updated notes)
+        self.note_index = note_index
+        # Block that stopped being live (updated or deleted notes)
+        self.previous_id = previous_id
+
+    def __repr__(self):
+        return (f"<NoteEvent({self.kind}, note_id={self.note_id}, note_index={self.note_index}, "
+                f"previous_id={self.previous_id})>")
+
 class DiaryService:
-    def __init__(self, password: str):
-        # Use a fixed salt for testing (in production, store this securely)
-        self.salt = b'\x00'*16  # 16-byte salt
-        self.key = derive_key(password, self.salt)
+    def __init__(self, password: str, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 decrypt_workers: Optional[int] = None, decrypt_backend: Optional[str] = "auto",
+                 kdf: Callable[[str, bytes], bytes] = derive_key,
+                 db_manager: Optional[DatabaseManager] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.db_manager = db_manager or get_db_manager()
+        self.keystore = KeyStore(self.db_manager, kdf)
+        self.key = self._unlock_data_key(password, should_stop)
         self.crypto_handler = AESHandler(self.key)
-        self.blockchain = Blockchain(self.crypto_handler, db_manager)
+        self.blockchain = Blockchain(self.crypto_handler, self.db_manager)
+        self.note_cache = NoteCache(cache_bytes)
+        self.decrypt_workers = decrypt_workers
+        self.decrypt_backend = decrypt_backend
+        self.search_index = SearchIndex()
+        self._listeners: List[Callable[[NoteEvent], None]] = []
         
         if not self._verify_password():
             raise ValueError("Invalid password or corrupted data")
+        if self.blockchain.revisions_missing():
+            logger.info("Indexing note revisions for the first time")
+            self.blockchain.rebuild_note_revisions()
+        if self.blockchain.states_missing():
+            logger.info("Indexing edited and deleted notes for the first time")
+            self.blockchain.rebuild_block_states()
 
-    def _init_crypto(self):
-        """Initialize crypto with proper key derivation"""
-        salt_path = "data/keystore/salt.bin"
+    @timed("diary.unlock")
+    def _unlock_data_key(self, password: str, should_stop: Optional[Callable[[], bool]] = None) -> bytes:
+        """Unwrap the data key, creating the keystore on first use.
+
+        A first unlock writes the keystore and then the genesis block;
+        `should_stop` can cancel it up to that point (UnlockCancelled).
+        """
+        if self.keystore.exists():
+            return self.keystore.unlock(password)
         
-        # خواندن یا ایجاد salt
-        if os.path.exists(salt_path):
-            with open(salt_path, 'rb') as f:
-                salt = f.read()
-        else:
-            os.makedirs(os.path.dirname(salt_path), exist_ok=True)
-            salt = os.urandom(32)
-            with open(salt_path, 'wb') as f:
-                f.write(salt)
+        genesis = self._find_genesis()
+        if genesis is None:
+            # New notebook: blocks get a random data key
+            return self.keystore.create(password, should_stop=should_stop)
         
-        # تولید کلید
-        key = derive_key(self.password, salt)
-        return AESHandler(key)
+        # Notebook from before the keystore: its password-derived key becomes the data key
+        legacy_key = self.keystore.derive_legacy_key(password)
+        try:
+            genesis.get_decrypted_data(AESHandler(legacy_key))
+        except Exception:
+            raise ValueError("Invalid password or corrupted data")
+        return self.keystore.create(password, legacy_key, should_stop)
+
+    def _find_genesis(self) -> Optional[Block]:
+        """Get the genesis block without creating one"""
+        session = self.db_manager.get_session()
+        try:
+            return session.query(Block).filter(Block.index == 0).first()
+        finally:
+            session.close()
+
+    @timed("diary.change_password")
+    def change_password(self, old_password: str, new_password: str) -> bool:
+        """Re-wrap the data key under a new password; no block is re-encrypted"""
+        if not new_password:
+            raise ValueError("Password cannot be empty!")
+        return self.keystore.change_password(old_password, new_password)
+
+    def subscribe(self, listener: Callable[[NoteEvent], None]) -> Callable[[], None]:
+        """Call `listener` with a NoteEvent after every change; returns an unsubscribe function.
+
+        Listeners run on whichever thread made the change.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _emit(self, event: NoteEvent):
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Note event listener failed on {event}: {e}")
 
     def verify_password(self) -> bool:
         """Verify password by decrypting genesis block"""
@@ -51,6 +132,7 @@ class DiaryService:
             logger.error(f"Password verification failed: {e}")
             return False
 
+    @timed("diary.add_note")
     def add_note(self, note_content: str) -> bool:
         """Add new note to blockchain"""
         try:
@@ -59,67 +141,171 @@ class DiaryService:
                 "created_at": str(datetime.utcnow()),
                 "hash": hashlib.sha256(note_content.encode()).hexdigest()
             }
-            return self.blockchain.add_block(note_data)
+            new_index = self.blockchain.append_block(note_data)
+            if new_index is None:
+                return False
+            self.search_index.add(new_index, note_content)
+            self._emit(NoteEvent(NoteEvent.ADDED, new_index, new_index,
+                                 {"id": new_index, "date": note_data["created_at"], "content": note_content},
+                                 note_index=new_index))
+            return True
         except Exception as e:
             logger.error(f"Error adding note: {e}")
             return False
 
+    @timed("diary.update_note")
     def update_note(self, index: int, content: str) -> bool:
-        """Update existing note by marking old as deleted and creating new"""
+        """Update existing note by creating a new block that supersedes the old one"""
         try:
-            # Mark old note as deleted
-            self.blockchain.mark_as_deleted(index)
-            
-            # Create new note with updated content
             note_data = {
                 "content": content,
                 "created_at": str(datetime.utcnow()),
                 "updated_from": index,
                 "hash": hashlib.sha256(content.encode()).hexdigest()
             }
-            return self.blockchain.add_block(note_data)
+            new_index = self.blockchain.append_block(note_data, supersedes=index)
+            if new_index is None:
+                return False
+            self.search_index.remove(index)
+            self.search_index.add(new_index, content)
+            self._emit(NoteEvent(NoteEvent.UPDATED, self.blockchain.get_note_id(new_index), new_index,
+                                 {"id": new_index, "date": note_data["created_at"], "content": content}, index,
+                                 note_index=new_index))
+            return True
         except Exception as e:
             logger.error(f"Error updating note: {e}")
             return False
 
+    @timed("diary.import_notes")
+    def import_notes(self, records: Iterable[Dict], batch_size: int = APPEND_BATCH_SIZE) -> int:
+        """Bulk-append notes from records with a "content" and optional "created_at" key.
+
+        Records are consumed lazily and written in one transaction; returns
+        the number of notes imported.
+        """
+        note_data = (
+            {
+                "content": record["content"],
+                "created_at": record.get("created_at") or str(datetime.utcnow()),
+                "hash": hashlib.sha256(record["content"].encode()).hexdigest()
+            }
+            for record in records
+        )
+        new_indices = self.blockchain.add_blocks(note_data, batch_size)
+        if new_indices:
+            # Re-read the imported range in batches rather than holding every note in memory
+            for note in self.iter_notes(after_index=new_indices[0] - 1):
+                self.search_index.add(note["id"], note["content"])
+            self._emit(NoteEvent(NoteEvent.RELOADED, block_index=new_indices[-1]))
+        return len(new_indices)
+
+    @timed("diary.delete_note")
     def delete_note(self, index: int) -> bool:
         """Mark note as deleted in blockchain"""
         try:
-            return self.blockchain.mark_as_deleted(index)
+            if not self.blockchain.mark_as_deleted(index):
+                return False
+            self.search_index.remove(index)
+            self._emit(NoteEvent(NoteEvent.DELETED, self.blockchain.get_note_id(index), self.blockchain.tip_index,
+                                 previous_id=index))
+            return True
         except Exception as e:
             logger.error(f"Error deleting note: {e}")
             return False
 
+    @timed("diary.get_all_notes")
     def get_all_notes(self) -> List[Dict]:
         """Get all active notes from blockchain"""
         notes = []
-        session = db_manager.get_session()
+        session = self.db_manager.get_session()
         try:
-            blocks = self.blockchain.get_all_blocks(session)
-            for block in blocks[1:]:  # Skip genesis
-                if block.index in self.blockchain.deleted_blocks:
+            blocks = self.blockchain.get_live_note_blocks(session)
+            payloads = self._decrypt_blocks(blocks)
+            for block in blocks:
+                data = payloads.get(block.index)
+                if data is None:
                     continue
-                    
-                try:
-                    data = block.get_decrypted_data(self.blockchain.crypto)
-                    notes.append({
+                notes.append({
+                    "id": block.index,
+                    "content": data["content"],
+                    "date": data.get("created_at", ""),
+                    "hash": data.get("hash", "")
+                })
+            return notes
+        finally:
+            session.close()
+
+    def iter_notes(self, batch_size: int = 500, after_index: int = 0) -> Iterator[Dict]:
+        """Stream live notes in index order, decrypting one batch at a time"""
+        while True:
+            session = self.db_manager.get_session()
+            try:
+                page = self.blockchain.get_note_page(session, after_index, batch_size)
+                blocks = self.blockchain.get_blocks_by_indices(session, [row.index for row in page])
+            finally:
+                session.close()
+            if not page:
+                return
+            
+            payloads = self._decrypt_blocks(blocks)
+            for block in blocks:
+                data = payloads.get(block.index)
+                if data is not None:
+                    yield {
                         "id": block.index,
                         "content": data["content"],
                         "date": data.get("created_at", ""),
                         "hash": data.get("hash", "")
-                    })
-                except Exception as e:
-                    logger.error(f"Error decrypting block {block.index}: {e}")
-            return notes
+                    }
+            after_index = page[-1].index
+
+    @timed("diary.build_search_index")
+    def build_search_index(self, should_stop: Optional[Callable[[], bool]] = None) -> int:
+        """Index the full content of every live note, returning the number indexed"""
+        self.search_index.clear()
+        for note in self.iter_notes():
+            if should_stop and should_stop():
+                break
+            self.search_index.add(note["id"], note["content"])
+        return len(self.search_index)
+
+    @timed("diary.search_notes")
+    def search_notes(self, query: str, limit: Optional[int] = SEARCH_LIMIT) -> List[int]:
+        """Get indices of notes matching a search query, best match first"""
+        return self.search_index.search(query, limit)
+
+    @timed("diary.get_note_page")
+    def get_note_page(self, after_index: int = 0, limit: int = 100) -> List[Dict]:
+        """Get the next page of live notes after a block index, without decrypting them"""
+        session = self.db_manager.get_session()
+        try:
+            return [
+                {"id": row.index, "date": str(row.timestamp)}
+                for row in self.blockchain.get_note_page(session, after_index, limit)
+            ]
+        finally:
+            session.close()
+
+    @timed("diary.get_note_count")
+    def get_note_count(self) -> int:
+        """Get the number of live notes"""
+        session = self.db_manager.get_session()
+        try:
+            return self.blockchain.count_notes(session)
         finally:
             session.close()
 
+    def is_live_note(self, index: int) -> bool:
+        """Whether a block index is a current note, as opposed to genesis, a tombstone or an old revision"""
+        return self.blockchain.is_live_note(index)
+
+    @timed("diary.get_note_by_index")
     def get_note_by_index(self, index: int) -> Optional[dict]:
         """Get decrypted note by index"""
         try:
             block = self.blockchain.get_block_by_index(index)
             if block:
-                decrypted_data = block.get_decrypted_data(self.crypto_handler)
+                decrypted_data = self._decrypt_block(block)
                 return {
                     'content': decrypted_data.get('content', ''),
                     'date': str(block.timestamp),
@@ -130,24 +316,165 @@ class DiaryService:
             logger.error(f"Error getting note {index}: {e}")
             return None
 
+    @timed("diary.get_note_previews")
+    def get_note_previews(self, indices: List[int], length: int = 50) -> Dict[int, dict]:
+        """Get date and the first `length` characters of several notes, decrypted in one batch"""
+        session = self.db_manager.get_session()
+        try:
+            blocks = self.blockchain.get_blocks_by_indices(session, indices)
+            payloads = self._decrypt_blocks(blocks)
+            return {
+                block.index: {"date": str(block.timestamp), "content": payloads[block.index].get("content", "")[:length]}
+                for block in blocks if block.index in payloads
+            }
+        finally:
+            session.close()
+
+    @timed("diary.get_note_history")
+    def get_note_history(self, note_id: int) -> List[Dict]:
+        """Revisions of a note, oldest first, without decrypting any of them.
+
+        `note_id` may be the note's stable ID or the block index of any of
+        its revisions.
+        """
+        session = self.db_manager.get_session()
+        try:
+            return [
+                {"note_id": row.note_id, "revision": row.revision, "id": row.block_index, "date": str(row.timestamp)}
+                for row in self.blockchain.get_note_revisions(session, note_id)
+            ]
+        finally:
+            session.close()
+
+    @timed("diary.get_note_revision")
+    def get_note_revision(self, note_id: int, revision: Optional[int] = None) -> Optional[dict]:
+        """Decrypt one revision of a note, the latest by default"""
+        session = self.db_manager.get_session()
+        try:
+            index = self.blockchain.get_revision_index(session, note_id, revision)
+        finally:
+            session.close()
+        return None if index is None else self.get_note_by_index(index)
+
+    @timed("diary.diff_revisions")
+    def diff_revisions(self, note_id: int, old_revision: int, new_revision: int, context: int = 3) -> List[str]:
+        """Unified diff between two revisions of a note; only those two blocks are decrypted"""
+        session = self.db_manager.get_session()
+        try:
+            indices = [self.blockchain.get_revision_index(session, note_id, revision)
+                       for revision in (old_revision, new_revision)]
+            if None in indices:
+                raise ValueError(f"Note {note_id} has no revision {old_revision if indices[0] is None else new_revision}")
+            payloads = self._decrypt_blocks(self.blockchain.get_blocks_by_indices(session, indices))
+        finally:
+            session.close()
+        for index in indices:
+            if index not in payloads:
+                raise ValueError(f"Block {index} could not be decrypted")
+        old_text, new_text = (payloads[index].get("content", "") for index in indices)
+        return list(difflib.unified_diff(
+            old_text.splitlines(), new_text.splitlines(),
+            f"revision {old_revision} (block #{indices[0]})", f"revision {new_revision} (block #{indices[1]})",
+            n=context, lineterm=""
+        ))
+
+    def _decrypt_block(self, block) -> dict:
+        """Decrypt block data through the note cache"""
+        cache_key = (block.index, block.current_hash)
+        data = self.note_cache.get(cache_key)
+        if data is None:
+            data = block.get_decrypted_data(self.crypto_handler)
+            self.note_cache.put(cache_key, data)
+        return data
+
+    def _decrypt_blocks(self, blocks) -> Dict[int, dict]:
+        """Decrypt many blocks at once, batching every cache miss through the decrypt pool"""
+        payloads = {}
+        misses = []
+        for block in blocks:
+            data = self.note_cache.get((block.index, block.current_hash))
+            if data is None:
+                misses.append(block)
+            else:
+                payloads[block.index] = data
+
+        metrics.increment("diary.cache_hits", len(payloads))
+        metrics.increment("diary.blocks_decrypted", len(misses))
+        results = self.crypto_handler.decrypt_many(
+            (block.encrypted_data for block in misses),
+            workers=self.decrypt_workers,
+            backend=self.decrypt_backend
+        )
+        for block, result in zip(misses, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                data = Block.decode_data(result)
+            except Exception as e:
+                logger.error(f"Error decrypting block {block.index}: {e}")
+                continue
+            self.note_cache.put((block.index, block.current_hash), data)
+            payloads[block.index] = data
+        return payloads
+
+    @timed("diary.warm_cache")
+    def warm_cache(self, indices: List[int]):
+        """Decrypt the given blocks into the note cache in one batch"""
+        session = self.db_manager.get_session()
+        try:
+            self._decrypt_blocks(self.blockchain.get_blocks_by_indices(session, indices))
+        finally:
+            session.close()
+
+    def get_cache_stats(self) -> dict:
+        """Get decrypted note cache counters"""
+        return self.note_cache.stats()
+
     def cleanup(self):
         """Securely clear sensitive data"""
-        self.password = None
-        self.crypto.key = None
-        del self.crypto
+        self.note_cache.clear()
+        self.search_index.clear()
+        self.key = None
+        self.crypto_handler.key = None
 
     def get_chain_length(self) -> int:
         """Get the length of the blockchain"""
         return self.blockchain.get_chain_length()
 
-    def is_chain_valid(self) -> bool:
+    def is_chain_valid(self, full_audit: bool = False) -> bool:
         """Verify the integrity of the blockchain"""
-        session = self.blockchain.db_manager.get_session()
+        return self.verify_chain(full_audit).valid
+
+    @timed("diary.verify_chain")
+    def verify_chain(self, full_audit: bool = False):
+        """Verify the blockchain and report the first broken link, if any"""
+        session = self.db_manager.get_session()
         try:
-            return self.blockchain.is_chain_valid(session)
+            return self.blockchain.verify_chain(session, full_audit=full_audit)
         finally:
             session.close()
 
+    @timed("diary.parallel_audit")
+    def parallel_audit(self, workers: Optional[int] = None):
+        """Audit the whole chain across worker processes and report every broken link"""
+        return self.blockchain.parallel_audit(workers)
+
+    def verify_block(self, index: int):
+        """Verify one block against its Merkle checkpoint instead of the whole chain"""
+        return self.blockchain.verify_block(index)
+
+    def get_inclusion_proof(self, index: int):
+        """Merkle inclusion proof for a block, or None if its range is not sealed yet"""
+        return self.blockchain.get_inclusion_proof(index)
+
+    def rebuild_block_states(self) -> int:
+        """Recompute which blocks are edited, deleted or tombstones from the chain"""
+        return self.blockchain.rebuild_block_states()
+
+    def rebuild_merkle_checkpoints(self) -> int:
+        """Recompute the Merkle checkpoints, e.g. for a database created before they existed"""
+        return self.blockchain.rebuild_merkle_checkpoints()
+
     def _verify_password(self) -> bool:
         """Verify the password can decrypt the genesis block"""
         try:
@@ -0,0 +1,83 @@
+from typing import Callable, Dict, Iterator, Optional
+import json
+import logging
+import os
+import time
+
+from src.core.crypto.aes_handler import AESHandler
+from src.core.crypto.key_derivation import derive_key
+from src.core.utils.file_io import SecureFileHandler
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_BYTES = 1024 * 1024
+EXPORT_SALT_SIZE = 16
+# Progress is reported every PROGRESS_EVERY notes or PROGRESS_INTERVAL seconds, whichever comes first
+PROGRESS_EVERY = 1000
+PROGRESS_INTERVAL = 0.1
+
+class ExportCancelled(Exception):
+    """Raised when an export is stopped before it finishes"""
+
+def export_notes(diary_service, path: str, password: Optional[str] = None,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 chunk_bytes: int = EXPORT_CHUNK_BYTES,
+                 kdf: Callable[[str, bytes], bytes] = derive_key) -> int:
+    """Export every live note as JSON Lines, block by block.
+
+    Without a password the file is plaintext JSONL. With one, the notes
+    are streamed into a segmented container (see SecureFileHandler) with
+    `chunk_bytes` segments, under a key derived from the password and a
+    random salt stored in the file header. Only one batch of notes and one
+    segment are held in memory at a time. The file is written under a
+    temporary name and only moved into place once complete. Returns the
+    number of notes exported.
+    """
+    total = diary_service.get_note_count()
+    state = {"exported": 0, "reported_at": time.monotonic()}
+
+    def notes() -> Iterator[Dict]:
+        for note in diary_service.iter_notes():
+            if should_stop and should_stop():
+                raise ExportCancelled()
+            yield note
+            state["exported"] += 1
+            # A GUI progress callback is a cross-thread signal; one per note would flood the event loop
+            if progress and (state["exported"] % PROGRESS_EVERY == 0
+                             or time.monotonic() - state["reported_at"] >= PROGRESS_INTERVAL):
+                progress(state["exported"], total)
+                state["reported_at"] = time.monotonic()
+        if progress:
+            progress(state["exported"], total)
+
+    temp_path = path + ".part"
+    try:
+        if password is None:
+            with open(temp_path, 'wb') as f:
+                for note in notes():
+                    f.write((json.dumps(note, ensure_ascii=False) + "\n").encode('utf-8'))
+        else:
+            salt = os.urandom(EXPORT_SALT_SIZE)
+            handler = SecureFileHandler(AESHandler(kdf(password, salt)), segment_size=chunk_bytes)
+            handler.save_encrypted(temp_path, notes(), header=salt)
+        os.replace(temp_path, path)
+        return state["exported"]
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def iter_encrypted_export(path: str, password: str,
+                          kdf: Callable[[str, bytes], bytes] = derive_key) -> Iterator[Dict]:
+    """Read back an encrypted export one note at a time"""
+    salt = SecureFileHandler.read_header(path)
+    handler = SecureFileHandler(AESHandler(kdf(password, salt)))
+    yield from handler.iter_records(path)
+
+def read_encrypted_export_note(path: str, number: int, password: str,
+                               kdf: Callable[[str, bytes], bytes] = derive_key) -> Dict:
+    """Read the n-th note of an encrypted export without decrypting the rest"""
+    salt = SecureFileHandler.read_header(path)
+    handler = SecureFileHandler(AESHandler(kdf(password, salt)))
+    return handler.read_record(path, number)
@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Dict, Iterator
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+def iter_text_files(directory: str, pattern: str = "*.txt") -> Iterator[Dict]:
+    """Yield one note record per text file in a directory, in file name order"""
+    for path in sorted(Path(directory).glob(pattern)):
+        if not path.is_file():
+            continue
+        try:
+            content = path.read_text(encoding='utf-8').strip()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Skipping {path}: {e}")
+            continue
+        if content:
+            yield {"content": content}
+
+def iter_jsonl(path: str, content_field: str = "content") -> Iterator[Dict]:
+    """Yield note records from a JSON Lines file, one line at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping {path}:{line_number}: {e}")
+                continue
+            
+            if isinstance(record, str):
+                record = {content_field: record}
+            content = record.get(content_field) if isinstance(record, dict) else None
+            if not isinstance(content, str) or not content.strip():
+                logger.error(f"Skipping {path}:{line_number}: no '{content_field}' text")
+                continue
+            yield {"content": content, "created_at": record.get("created_at")}
+
+def import_path(diary_service, path: str, batch_size: int = 500) -> int:
+    """Stream a directory of text files or a JSONL file into the diary"""
+    if Path(path).is_dir():
+        records = iter_text_files(path)
+    else:
+        records = iter_jsonl(path)
+    return diary_service.import_notes(records, batch_size)
@@ -0,0 +1,158 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import math
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Results returned when the caller does not ask for a number
+SEARCH_LIMIT = 200
+# Shorter terms match only the exact word; "a" would otherwise expand to a large part of the vocabulary
+MIN_PREFIX_LENGTH = 2
+# Words a prefix expands to, besides the exact word, in alphabetical order
+MAX_PREFIX_TOKENS = 64
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class SearchIndex:
+    """In-memory inverted index over decrypted note content.
+
+    The index only ever lives in process memory and is dropped on lock,
+    so no plaintext reaches the disk.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: List[str] = []
+        self._note_tokens: Dict[int, Counter] = {}
+        # Notes removed since the last clear. A block never becomes live again,
+        # so a background build that read one of them before it was edited or
+        # deleted must not add it back.
+        self._removed: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def add(self, note_id: int, text: str):
+        """Index a note, replacing any previous content for the same id; removed notes are skipped"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if note_id in self._removed:
+                return
+            self._remove(note_id)
+            self._note_tokens[note_id] = counts
+            for token, count in counts.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    insort(self._vocabulary, token)
+                postings[note_id] = count
+
+    def remove(self, note_id: int):
+        """Drop a note from the index for good"""
+        with self._lock:
+            self._removed.add(note_id)
+            self._remove(note_id)
+
+    def _remove(self, note_id: int):
+        counts = self._note_tokens.pop(note_id, None)
+        if not counts:
+            return
+        for token in counts:
+            postings = self._postings[token]
+            del postings[note_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def search(self, query: str, limit: Optional[int] = SEARCH_LIMIT) -> List[int]:
+        """Return ids of notes matching every query term as a word prefix, best match first.
+
+        The rarest term is scored over all its notes and the others only
+        over those candidates; the top `limit` are picked with a heap
+        (limit=None ranks every match).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            total = len(self._note_tokens)
+            matches = [self._prefix_matches(term, total) for term in terms]
+            if not all(matches):
+                return []
+            matches.sort(key=lambda term_matches: sum(len(postings) for postings, _ in term_matches))
+            scores = self._score(matches[0])
+            for term_matches in matches[1:]:
+                scores = self._rescore(scores, term_matches)
+                if not scores:
+                    return []
+
+        # Scores are built in posting order, roughly oldest note first. Ties go to
+        # the newer note, so walking newest first keeps the heap from replacing
+        # its smallest entry on nearly every candidate.
+        ranked = ((score, note_id) for note_id, score in reversed(scores.items()))
+        if limit is None:
+            return [note_id for _, note_id in sorted(ranked, reverse=True)]
+        return [note_id for _, note_id in heapq.nlargest(limit, ranked)]
+
+    def _prefix_matches(self, prefix: str, total: int) -> List[Tuple[Dict[int, int], float]]:
+        """(postings, IDF weight) of the exact word and up to MAX_PREFIX_TOKENS words starting with prefix"""
+        matches = []
+        postings = self._postings.get(prefix)
+        if postings:
+            matches.append((postings, math.log(1 + total / len(postings))))
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return matches
+
+        position = bisect_left(self._vocabulary, prefix)
+        end = min(position + MAX_PREFIX_TOKENS + 1, len(self._vocabulary))
+        while position < end and self._vocabulary[position].startswith(prefix):
+            token = self._vocabulary[position]
+            if token != prefix:
+                postings = self._postings[token]
+                # Exact word matches outrank longer words that merely share the prefix
+                matches.append((postings, math.log(1 + total / len(postings)) * 0.5))
+            position += 1
+        return matches
+
+    @staticmethod
+    def _score(matches: List[Tuple[Dict[int, int], float]]) -> Dict[int, float]:
+        """TF-IDF scores of every note in the matched postings"""
+        postings, weight = matches[0]
+        scores = {note_id: (1 + math.log(count)) * weight for note_id, count in postings.items()}
+        for postings, weight in matches[1:]:
+            for note_id, count in postings.items():
+                scores[note_id] = scores.get(note_id, 0.0) + (1 + math.log(count)) * weight
+        return scores
+
+    @staticmethod
+    def _rescore(scores: Dict[int, float], matches: List[Tuple[Dict[int, int], float]]) -> Dict[int, float]:
+        """Keep the candidates that also match another term, adding its score"""
+        if sum(len(postings) for postings, _ in matches) < len(scores) * len(matches):
+            # Cheaper to walk the term's postings than to probe them for every candidate
+            extra = SearchIndex._score(matches)
+            return {note_id: scores[note_id] + score for note_id, score in extra.items() if note_id in scores}
+        rescored = {}
+        for note_id, score in scores.items():
+            extra = 0.0
+            for postings, weight in matches:
+                count = postings.get(note_id)
+                if count:
+                    extra += (1 + math.log(count)) * weight
+            if extra:
+                rescored[note_id] = score + extra
+        return rescored
+
+    def clear(self):
+        """Drop the whole index"""
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._note_tokens.clear()
+            self._removed.clear()
+
+    def __len__(self) -> int:
+        return len(self._note_tokens)
@@ -0,0 +1,97 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QPushButton,
+                             QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox)
+
+from src.core.metrics import metrics
+
+TIMER_COLUMNS = ["Name", "Calls", "Mean (ms)", "p95 (ms)", "Max (ms)", "Total (ms)"]
+
+class DiagnosticsDialog(QDialog):
+    """Live view of the metrics registry with a JSON dump"""
+
+    def __init__(self, diary_service=None, parent=None):
+        super().__init__(parent)
+        self.diary_service = diary_service
+        self.setWindowTitle("Diagnostics")
+        self.resize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        self.enabled_box = QCheckBox("Collect metrics")
+        self.enabled_box.setChecked(metrics.enabled)
+        self.cache_label = QLabel()
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(TIMER_COLUMNS)
+        self.tree.setColumnWidth(0, 360)
+
+        buttons = QHBoxLayout()
+        self.refresh_button = QPushButton("Refresh")
+        self.reset_button = QPushButton("Reset")
+        self.save_button = QPushButton("Save JSON...")
+        self.close_button = QPushButton("Close")
+        buttons.addWidget(self.refresh_button)
+        buttons.addWidget(self.reset_button)
+        buttons.addStretch()
+        buttons.addWidget(self.save_button)
+        buttons.addWidget(self.close_button)
+
+        layout.addWidget(self.enabled_box)
+        layout.addWidget(self.cache_label)
+        layout.addWidget(self.tree)
+        layout.addLayout(buttons)
+
+        self.enabled_box.toggled.connect(self.set_enabled)
+        self.refresh_button.clicked.connect(self.refresh)
+        self.reset_button.clicked.connect(self.reset)
+        self.save_button.clicked.connect(self.save_json)
+        self.close_button.clicked.connect(self.accept)
+        self.refresh()
+
+    def extra_sections(self) -> dict:
+        """Service state that is not part of the registry"""
+        if not self.diary_service:
+            return {}
+        return {"note_cache": self.diary_service.get_cache_stats()}
+
+    def refresh(self):
+        """Reload the tree from a fresh snapshot"""
+        snapshot = metrics.snapshot()
+        self.tree.clear()
+
+        cache = self.extra_sections().get("note_cache")
+        self.cache_label.setText(
+            f"Note cache: {cache['entries']} entries, {cache['bytes'] // 1024} KiB, "
+            f"{cache['hits']} hits, {cache['misses']} misses" if cache else "Note cache: diary locked"
+        )
+
+        for title, histograms in (("Operations", snapshot["timers"]), ("SQL statements", snapshot["sql"])):
+            group = QTreeWidgetItem(self.tree, [f"{title} ({len(histograms)})"])
+            for name, h in sorted(histograms.items(), key=lambda item: -item[1]["total_ms"]):
+                QTreeWidgetItem(group, [name, str(h["count"]), f"{h['mean_ms']:.3f}", f"{h['p95_ms']:.3f}",
+                                        f"{h['max_ms']:.3f}", f"{h['total_ms']:.1f}"])
+            group.setExpanded(True)
+
+        counters = QTreeWidgetItem(self.tree, [f"Counters ({len(snapshot['counters'])})"])
+        for name, value in sorted(snapshot["counters"].items()):
+            QTreeWidgetItem(counters, [name, str(value)])
+        counters.setExpanded(True)
+
+    def set_enabled(self, enabled):
+        if enabled:
+            metrics.enable()
+        else:
+            metrics.disable()
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def save_json(self):
+        """Dump the current snapshot to a file chosen by the user"""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Diagnostics", "cryptonote-metrics.json",
+                                              "JSON (*.json)")
+        if not path:
+            return
+        try:
+            metrics.dump_json(path, self.extra_sections())
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not save diagnostics: {e}")
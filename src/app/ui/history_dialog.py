@@ -0,0 +1,120 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+                             QPlainTextEdit)
+from PyQt5.QtGui import QFontDatabase
+
+class NoteHistoryDialog(QDialog):
+    """Revisions of one note with a diff between any two of them.
+
+    The revision list, each revision and each diff are read on the task
+    runner's pool; the dialog shows a placeholder until they arrive.
+    """
+
+    def __init__(self, diary_service, note_id, task_runner, parent=None):
+        super().__init__(parent)
+        self.diary_service = diary_service
+        self.task_runner = task_runner
+        self.note_id = note_id
+        self.history = []
+        self.setWindowTitle("Note History")
+        self.resize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        pickers = QHBoxLayout()
+        self.old_box = QComboBox()
+        self.new_box = QComboBox()
+        pickers.addWidget(QLabel("From:"))
+        pickers.addWidget(self.old_box, 1)
+        pickers.addWidget(QLabel("To:"))
+        pickers.addWidget(self.new_box, 1)
+
+        self.title_label = QLabel(f"Note #{note_id}: loading revisions...")
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.view.setPlainText("Loading...")
+
+        buttons = QHBoxLayout()
+        self.close_button = QPushButton("Close")
+        buttons.addStretch()
+        buttons.addWidget(self.close_button)
+
+        layout.addWidget(self.title_label)
+        layout.addLayout(pickers)
+        layout.addWidget(self.view)
+        layout.addLayout(buttons)
+
+        self.old_box.setEnabled(False)
+        self.new_box.setEnabled(False)
+        self.old_box.currentIndexChanged.connect(self.refresh)
+        self.new_box.currentIndexChanged.connect(self.refresh)
+        self.close_button.clicked.connect(self.accept)
+
+        # Listing the revisions reads the index only; nothing is decrypted until a pair is shown
+        service = diary_service
+        self.task_runner.submit(
+            lambda: service.get_note_history(note_id),
+            self.show_history,
+            lambda message: self.view.setPlainText(f"Could not load the history: {message}"),
+            channel="history"
+        )
+
+    def show_history(self, history):
+        """Fill the revision pickers and show the latest change"""
+        self.history = history
+        if history:
+            self.note_id = history[0]["note_id"]
+        self.title_label.setText(f"Note #{self.note_id}: {len(history)} revision(s)")
+        if not history:
+            self.view.setPlainText("This note has no recorded revisions.")
+            return
+
+        for box in (self.old_box, self.new_box):
+            box.blockSignals(True)
+            for revision in history:
+                box.addItem(f"Revision {revision['revision']} - {revision['date']} (block #{revision['id']})",
+                            revision["revision"])
+            box.blockSignals(False)
+            box.setEnabled(True)
+        self.old_box.blockSignals(True)
+        self.old_box.setCurrentIndex(max(len(history) - 2, 0))
+        self.old_box.blockSignals(False)
+        self.new_box.blockSignals(True)
+        self.new_box.setCurrentIndex(len(history) - 1)
+        self.new_box.blockSignals(False)
+        self.refresh()
+
+    def refresh(self):
+        """Load the selected revision, or the diff between the two selected revisions"""
+        if not self.history:
+            return
+
+        service = self.diary_service
+        note_id = self.note_id
+        old_revision = self.old_box.currentData()
+        new_revision = self.new_box.currentData()
+        if old_revision == new_revision:
+            load = lambda: service.get_note_revision(note_id, new_revision)
+        else:
+            load = lambda: service.diff_revisions(note_id, old_revision, new_revision)
+
+        self.view.setPlainText("Loading...")
+        # A newer selection supersedes this one on the channel
+        self.task_runner.submit(
+            load,
+            lambda result: self.show_revision(old_revision == new_revision, result),
+            lambda message: self.view.setPlainText(f"Could not load the revision: {message}"),
+            channel="revision"
+        )
+
+    def show_revision(self, single, result):
+        if single:
+            self.view.setPlainText(result["content"] if result else "This revision could not be read.")
+        else:
+            self.view.setPlainText("\n".join(result) if result else "The revisions are identical.")
+
+    def done(self, result):
+        # Results still in flight must not reach a closed dialog
+        self.task_runner.cancel("history")
+        self.task_runner.cancel("revision")
+        super().done(result)
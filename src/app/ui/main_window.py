@@ -1,28 +1,50 @@
 import logging
-from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QLabel, QMessageBox, QStatusBar, QLineEdit, QInputDialog
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QLabel, QMessageBox, QStatusBar, QLineEdit, QInputDialog, QProgressDialog, QFileDialog
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QModelIndex
 from PyQt5.QtGui import QIcon
 
-from src.app.services.diary_service import DiaryService
 from .auth_dialog import AuthDialog
 from .sidebar import Sidebar
+from .notes_model import NOTE_INDEX_ROLE, PAGE_SIZE
 from .content_area import ContentArea
 from .menu_bar import MenuBar
+from .tasks import TaskRunner
 
 logger = logging.getLogger(__name__)
+# Broken blocks listed in the audit result dialog
+AUDIT_FAILURES_SHOWN = 10
+# Typing pauses this long before a search runs
+SEARCH_DELAY_MS = 200
+SEARCH_RESULTS = 200
 
 class MainWindow(QMainWindow):
     update_ui_signal = pyqtSignal()
+    # Service change events, re-emitted on the GUI thread
+    note_changed = pyqtSignal(object)
 
     def __init__(self, diary_service=None, parent=None):
         super().__init__(parent)
         self.diary_service = diary_service
         self.current_password = None
+        self.unlock_worker = None
+        self.unlock_progress = None
+        self.index_worker = None
+        self.export_worker = None
+        self.unsubscribe = None
+        self.note_count = 0
+        self.chain_length = 0
+        self.tasks = TaskRunner(self)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
         self.init_ui()
         self.setup_connections()
         
-        if not diary_service:
-            self.show_auth_dialog()
+        if diary_service:
+            self.watch_service(diary_service)
+        else:
+            # Let the window paint before asking for the password
+            QTimer.singleShot(0, self.show_auth_dialog)
 
     def init_ui(self):
         """Initialize the main UI components"""
@@ -37,6 +59,7 @@ class MainWindow(QMainWindow):
         
         # Create UI components
         self.sidebar = Sidebar()
+        self.sidebar.notes_model.task_runner = self.tasks
         self.content_area = ContentArea()
         
         main_layout.addWidget(self.sidebar, 1)  # Sidebar takes 1 part
@@ -70,21 +93,28 @@ class MainWindow(QMainWindow):
         self.content_area.delete_button.clicked.connect(self.delete_note)
         
         # List Interactions
-        self.sidebar.notes_list.currentItemChanged.connect(self.load_selected_note)
+        self.sidebar.notes_list.selectionModel().currentChanged.connect(self.load_selected_note)
         self.sidebar.notes_list.customContextMenuRequested.connect(self.show_context_menu)
         
         # Search
-        self.sidebar.search_box.textChanged.connect(self.filter_notes)
+        # Every keystroke restarts the timer, so only the final text is searched
+        self.sidebar.search_box.textChanged.connect(lambda text: self.search_timer.start())
+        self.search_timer.timeout.connect(self.filter_notes)
         
         # Menu Actions
         self.menu_bar.save_action.triggered.connect(self.save_note)
         self.menu_bar.new_action.triggered.connect(self.new_note)
+        self.menu_bar.export_action.triggered.connect(self.export_notes)
         self.menu_bar.lock_action.triggered.connect(self.lock_diary)
         self.menu_bar.change_pw_action.triggered.connect(self.change_password)
+        self.menu_bar.audit_action.triggered.connect(self.run_full_audit)
+        self.menu_bar.history_action.triggered.connect(self.show_note_history)
+        self.menu_bar.diagnostics_action.triggered.connect(self.show_diagnostics)
         self.menu_bar.exit_action.triggered.connect(self.close)
         
         # Internal Signals
         self.update_ui_signal.connect(self.refresh_ui)
+        self.note_changed.connect(self.on_note_changed)
 
     def show_auth_dialog(self):
         """Show authentication dialog to unlock the diary"""
@@ -92,12 +122,7 @@ class MainWindow(QMainWindow):
         if auth_dialog.exec_() == AuthDialog.Accepted:
             password = auth_dialog.get_password()
             if password:
-                try:
-                    self.initialize_services(password)
-                    self.update_ui_signal.emit()
-                except Exception as e:
-                    QMessageBox.warning(self, "Authentication Failed", str(e))
-                    self.show_auth_dialog()
+                self.initialize_services(password)
             else:
                 QMessageBox.warning(self, "Error", "Password cannot be empty!")
                 self.show_auth_dialog()
@@ -105,66 +130,254 @@ class MainWindow(QMainWindow):
             self.close()
 
     def initialize_services(self, password):
-        """Initialize services with password"""
+        """Unlock the diary in a background worker"""
+        from .workers import UnlockWorker
+
+        worker = UnlockWorker(password, self)
+        worker.progress.connect(self.on_unlock_progress)
+        worker.unlocked.connect(lambda service, snapshot: self.on_unlocked(worker, password, service, snapshot))
+        worker.failed.connect(lambda message: self.on_unlock_failed(worker, message))
+        worker.finished.connect(worker.deleteLater)
+        self.unlock_worker = worker
+
+        self.unlock_progress = QProgressDialog("Deriving encryption key...", "Cancel", 0, 0, self)
+        self.unlock_progress.setWindowTitle("Unlocking CryptoNote")
+        self.unlock_progress.setWindowModality(Qt.WindowModal)
+        self.unlock_progress.setMinimumDuration(0)
+        self.unlock_progress.canceled.connect(self.cancel_unlock)
+        self.unlock_progress.show()
+
+        self.status_bar.showMessage("Unlocking...")
+        worker.start()
+
+    def on_unlock_progress(self, percent, message):
+        """Reflect unlock progress in the progress dialog"""
+        if not self.unlock_progress:
+            return
+        if percent > 0 and self.unlock_progress.maximum() == 0:
+            self.unlock_progress.setRange(0, 100)
+        self.unlock_progress.setLabelText(message)
+        self.unlock_progress.setValue(percent)
+
+    def on_unlocked(self, worker, password, service, snapshot):
+        """Install the unlocked service and show the preloaded notebook"""
+        if worker is not self.unlock_worker:
+            # A cancelled unlock finished late
+            service.cleanup()
+            return
+        self.finish_unlock()
         self.current_password = password
-        self.diary_service = DiaryService(password)
-        
-        # Verify password by trying to decrypt the genesis block
-        if not self.diary_service.verify_password():
-            raise ValueError("Invalid password or corrupted data")
+        self.diary_service = service
+        self.watch_service(service)
+        self.populate_notes(snapshot["first_page"], snapshot["note_count"], snapshot["chain_length"])
+        self.content_area.note_editor.clear()
+        self.content_area.meta_label.clear()
+        self.update_security_status(snapshot["chain_valid"])
+        self.start_indexing()
+
+    def start_indexing(self):
+        """Build the search index for the unlocked diary in the background"""
+        from .workers import IndexWorker
+
+        worker = IndexWorker(self.diary_service, self)
+        worker.indexed.connect(lambda count: self.on_indexed(worker, count))
+        worker.finished.connect(worker.deleteLater)
+        self.index_worker = worker
+        self.status_bar.showMessage("Indexing notes...")
+        worker.start()
+
+    def on_indexed(self, worker, count):
+        """Search over full note content once the index is ready"""
+        if worker is not self.index_worker:
+            return
+        self.index_worker = None
+        self.status_bar.showMessage(f"Ready | {count} notes indexed")
+        if self.sidebar.search_box.text():
+            self.filter_notes()
+
+    def stop_indexing(self):
+        """Stop a running index build before the service goes away"""
+        if self.index_worker:
+            self.index_worker.requestInterruption()
+            self.index_worker.wait()
+            self.index_worker = None
+
+    def on_unlock_failed(self, worker, message):
+        """Report an unlock failure and ask for the password again"""
+        if worker is not self.unlock_worker:
+            return
+        self.finish_unlock()
+        self.status_bar.showMessage("Locked")
+        QMessageBox.warning(self, "Authentication Failed", message)
+        self.show_auth_dialog()
+
+    def cancel_unlock(self):
+        """Abandon the running unlock and return to the password prompt"""
+        if not self.unlock_worker:
+            return
+        self.unlock_worker.requestInterruption()
+        self.finish_unlock()
+        self.status_bar.showMessage("Locked")
+        self.show_auth_dialog()
+
+    def finish_unlock(self):
+        """Detach from the current unlock worker and close its dialog"""
+        self.unlock_worker = None
+        if self.unlock_progress:
+            self.unlock_progress.canceled.disconnect(self.cancel_unlock)
+            self.unlock_progress.close()
+            self.unlock_progress = None
 
     def refresh_ui(self):
         """Refresh all UI elements"""
         self.load_notes()
         self.content_area.note_editor.clear()
         self.content_area.meta_label.clear()
-        self.update_security_status()
 
     def load_notes(self):
-        """Load all notes from blockchain into the sidebar"""
+        """Reload the first page, stats and chain status in the background"""
         if not self.diary_service:
             return
-            
-        self.sidebar.notes_list.clear()
-        try:
-            notes = self.diary_service.get_all_notes()
-            
-            for note in notes:
-                self.sidebar.notes_list.addItem(f"{note['date']} - {note['content'][:50]}...")
-            
-            # Update stats
-            chain_length = self.diary_service.blockchain.get_chain_length()
-            self.sidebar.stats_label.setText(f"{len(notes)} notes | Chain length: {chain_length}")
-        except Exception as e:
-            logger.error(f"Error loading notes: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to load notes: {str(e)}")
+        
+        service = self.diary_service
+        
+        def snapshot():
+            return {
+                "first_page": service.get_note_page(0, PAGE_SIZE),
+                "note_count": service.get_note_count(),
+                "chain_length": service.get_chain_length(),
+                "chain_valid": service.is_chain_valid()
+            }
+        
+        self.status_bar.showMessage("Loading notes...")
+        self.tasks.submit(
+            snapshot,
+            self.on_notes_loaded,
+            lambda message: self.show_task_error("Failed to load notes", message),
+            channel="refresh"
+        )
+
+    def on_notes_loaded(self, snapshot):
+        """Show a freshly loaded notebook snapshot"""
+        self.populate_notes(snapshot["first_page"], snapshot["note_count"], snapshot["chain_length"])
+        self.update_security_status(snapshot["chain_valid"])
+        self.status_bar.showMessage("Ready")
+
+    def show_task_error(self, title, message):
+        """Report a background task failure"""
+        self.status_bar.showMessage("Ready")
+        QMessageBox.critical(self, "Error", f"{title}: {message}")
+
+    def populate_notes(self, first_page, note_count, chain_length):
+        """Point the notes model at the current service and update stats"""
+        self.sidebar.notes_model.set_service(self.diary_service, first_page)
+        if self.sidebar.search_box.text():
+            self.filter_notes()
+        
+        self.note_count = note_count
+        self.chain_length = chain_length
+        self.update_stats()
+
+    def update_stats(self):
+        self.sidebar.stats_label.setText(f"{self.note_count} notes | Chain length: {self.chain_length}")
+
+    def watch_service(self, service):
+        """Follow the service's change events instead of reloading after every write"""
+        if self.unsubscribe:
+            self.unsubscribe()
+        self.unsubscribe = service.subscribe(self.note_changed.emit)
+
+    def on_note_changed(self, event):
+        """Apply one note change to the list and stats"""
+        from src.app.services.diary_service import NoteEvent
+
+        if not self.diary_service:
+            return
+        if event.kind == NoteEvent.RELOADED:
+            self.load_notes()
+            return
+        
+        model = self.sidebar.notes_model
+        if self.sidebar.search_box.text():
+            # The search index is already updated; re-running the query is cheap
+            self.filter_notes()
+        else:
+            # List rows are keyed by block index, not by stable note ID
+            if event.kind in (NoteEvent.UPDATED, NoteEvent.DELETED):
+                model.remove_note(event.previous_id)
+            if event.kind in (NoteEvent.ADDED, NoteEvent.UPDATED):
+                model.append_note(event.note)
+        
+        if event.kind == NoteEvent.ADDED:
+            self.note_count += 1
+        elif event.kind == NoteEvent.DELETED:
+            self.note_count -= 1
+        if event.block_index is not None:
+            self.chain_length = max(self.chain_length, event.block_index + 1)
+        self.update_stats()
 
     def filter_notes(self):
-        """Filter notes based on search text"""
-        search_text = self.sidebar.search_box.text().lower()
+        """Show ranked full-text search results, or the whole list when the search is empty"""
+        if not self.diary_service:
+            return
         
-        for i in range(self.sidebar.notes_list.count()):
-            item = self.sidebar.notes_list.item(i)
-            item.setHidden(search_text not in item.text().lower())
+        search_text = self.sidebar.search_box.text().strip()
+        if not search_text:
+            self.tasks.cancel("search")
+            self.sidebar.notes_model.set_service(self.diary_service)
+            return
+        
+        service = self.diary_service
+        # The index lock may be held by a running index build; only the latest query's results are shown
+        self.tasks.submit(
+            lambda: service.search_notes(search_text, SEARCH_RESULTS),
+            self.show_search_results,
+            lambda message: self.show_task_error("Search failed", message),
+            channel="search"
+        )
+
+    def show_search_results(self, note_ids):
+        """Put the results of the latest search into the list"""
+        if self.diary_service and self.sidebar.search_box.text().strip():
+            self.sidebar.notes_model.show_results(note_ids)
+
+    def selected_note_id(self):
+        """Block index of the current note, or None"""
+        current = self.sidebar.notes_list.currentIndex()
+        if not current.isValid():
+            return None
+        return current.data(NOTE_INDEX_ROLE)
 
     def load_selected_note(self, current, previous):
         """Load selected note into editor"""
         if not self.diary_service:
             return
             
-        if current:
-            note_id = self.sidebar.notes_list.row(current)
-            try:
-                note = self.diary_service.get_note_by_index(note_id + 1)  # +1 for genesis
-                
-                if note:
-                    self.content_area.note_editor.setPlainText(note['content'])
-                    self.content_area.meta_label.setText(
-                        f"Created: {note['date']} | Block #{note_id + 1}"
-                    )
-            except Exception as e:
-                logger.error(f"Error loading note: {e}")
-                QMessageBox.critical(self, "Error", f"Failed to load note: {str(e)}")
+        if not current.isValid():
+            # Nothing selected any more: a load still in flight must not fill the editor
+            self.tasks.cancel("note")
+            return
+        
+        note_id = current.data(NOTE_INDEX_ROLE)
+        service = self.diary_service
+        self.content_area.meta_label.setText(f"Loading block #{note_id}...")
+        # A newer selection supersedes this one, so only the latest note is shown
+        self.tasks.submit(
+            lambda: service.get_note_by_index(note_id),
+            lambda note: self.show_note(note_id, note),
+            lambda message: self.show_task_error("Failed to load note", message),
+            channel="note"
+        )
+
+    def show_note(self, note_id, note):
+        """Put a loaded note into the editor"""
+        if not note:
+            self.content_area.meta_label.setText(f"Block #{note_id} could not be read")
+            return
+        self.content_area.note_editor.setPlainText(note['content'])
+        self.content_area.meta_label.setText(
+            f"Created: {note['date']} | Block #{note_id}"
+        )
 
     def save_note(self):
         """Save current note to blockchain"""
@@ -178,30 +391,44 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Empty Note", "Note cannot be empty!")
             return
             
-        try:
-            current_item = self.sidebar.notes_list.currentItem()
-            if current_item:
-                # Update existing note
-                note_id = self.sidebar.notes_list.row(current_item) + 1
-                success = self.diary_service.update_note(note_id, note_text)
-                message = "Note updated successfully!"
-            else:
-                # Create new note
-                success = self.diary_service.add_note(note_text)
-                message = "Note created successfully!"
-            
+        service = self.diary_service
+        note_id = self.selected_note_id()
+        if note_id is not None:
+            # Update existing note
+            save = lambda: service.update_note(note_id, note_text)
+            message = "Note updated successfully!"
+        else:
+            # Create new note
+            save = lambda: service.add_note(note_text)
+            message = "Note created successfully!"
+        
+        def saved(success):
+            self.set_saving(False)
             if success:
-                self.update_ui_signal.emit()
+                # The list already follows the change event; start from a blank editor like before
+                self.sidebar.notes_list.selectionModel().clear()
+                self.content_area.note_editor.clear()
+                self.content_area.meta_label.clear()
                 QMessageBox.information(self, "Success", message)
             else:
                 QMessageBox.warning(self, "Error", "Failed to save note!")
-        except Exception as e:
-            logger.error(f"Error saving note: {e}")
-            QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
+        
+        def failed(error):
+            self.set_saving(False)
+            self.show_task_error("An error occurred", error)
+        
+        self.set_saving(True)
+        self.tasks.submit(save, saved, failed, write=True)
+
+    def set_saving(self, saving):
+        """Block a second save while one is being written"""
+        self.content_area.save_button.setEnabled(not saving)
+        self.menu_bar.save_action.setEnabled(not saving)
+        self.status_bar.showMessage("Saving..." if saving else "Ready")
 
     def new_note(self):
         """Create new empty note"""
-        self.sidebar.notes_list.clearSelection()
+        self.sidebar.notes_list.selectionModel().clear()
         self.content_area.note_editor.clear()
         self.content_area.note_editor.setFocus()
         self.content_area.meta_label.clear()
@@ -212,12 +439,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Diary is locked. Please authenticate.")
             return
             
-        current_item = self.sidebar.notes_list.currentItem()
-        if not current_item:
+        note_id = self.selected_note_id()
+        if note_id is None:
             QMessageBox.warning(self, "No Selection", "Please select a note to delete.")
             return
             
-        note_id = self.sidebar.notes_list.row(current_item) + 1
         reply = QMessageBox.question(
             self,
             "Confirm Deletion",
@@ -227,13 +453,21 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            try:
-                if self.diary_service.delete_note(note_id):
-                    self.update_ui_signal.emit()
+            service = self.diary_service
+            
+            def deleted(success):
+                if success:
+                    self.sidebar.notes_list.selectionModel().clear()
+                    self.content_area.note_editor.clear()
+                    self.content_area.meta_label.clear()
                     QMessageBox.information(self, "Success", "Note marked as deleted.")
-            except Exception as e:
-                logger.error(f"Error deleting note: {e}")
-                QMessageBox.critical(self, "Error", str(e))
+            
+            self.tasks.submit(
+                lambda: service.delete_note(note_id),
+                deleted,
+                lambda message: self.show_task_error("Failed to delete note", message),
+                write=True
+            )
 
     def show_context_menu(self, position):
         """Show right-click context menu for notes"""
@@ -242,15 +476,113 @@ class MainWindow(QMainWindow):
         
         if action:
             if action.text() == "View Full Note":
-                self.load_selected_note(self.sidebar.notes_list.currentItem(), None)
+                self.load_selected_note(self.sidebar.notes_list.currentIndex(), QModelIndex())
+            elif action.text() == "Note History":
+                self.show_note_history()
             elif action.text() == "Delete Note":
                 self.delete_note()
 
+    def show_note_history(self):
+        """Show the revisions of the selected note and diff between them"""
+        if not self.diary_service:
+            QMessageBox.warning(self, "Error", "Diary is locked. Please authenticate.")
+            return
+        
+        note_id = self.selected_note_id()
+        if note_id is None:
+            QMessageBox.warning(self, "No Selection", "Please select a note to view its history.")
+            return
+        
+        from .history_dialog import NoteHistoryDialog
+        NoteHistoryDialog(self.diary_service, note_id, self.tasks, self).exec_()
+
+    def export_notes(self):
+        """Export all notes to a JSONL file in the background"""
+        if not self.diary_service:
+            QMessageBox.warning(self, "Error", "Diary is locked. Please authenticate.")
+            return
+        if self.export_worker:
+            QMessageBox.information(self, "Export", "An export is already running.")
+            return
+        
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export All Notes",
+            "notes.jsonl",
+            "Plain JSON Lines (*.jsonl);;Encrypted export (*.cnx)"
+        )
+        if not path:
+            return
+        
+        password = None
+        if selected_filter.startswith("Encrypted"):
+            password, ok = QInputDialog.getText(
+                self,
+                "Export Password",
+                "Password for the exported file:",
+                QLineEdit.Password
+            )
+            if not ok or not password:
+                return
+        
+        from .workers import ExportWorker
+        
+        worker = ExportWorker(self.diary_service, path, password, self)
+        progress = QProgressDialog("Exporting notes...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export All")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(worker.requestInterruption)
+        
+        def update_progress(done, total):
+            progress.setMaximum(max(total, 1))
+            progress.setValue(min(done, total))
+        
+        def finish(message=None, warning=False):
+            self.export_worker = None
+            progress.canceled.disconnect(worker.requestInterruption)
+            progress.close()
+            if message:
+                if warning:
+                    QMessageBox.warning(self, "Export Failed", message)
+                else:
+                    QMessageBox.information(self, "Export", message)
+            self.status_bar.showMessage("Ready")
+        
+        worker.progress.connect(update_progress)
+        worker.exported.connect(lambda count: finish(f"Exported {count} notes to {path}"))
+        worker.failed.connect(lambda message: finish(message, warning=True))
+        worker.cancelled.connect(lambda: finish())
+        worker.finished.connect(worker.deleteLater)
+        self.export_worker = worker
+        self.status_bar.showMessage("Exporting...")
+        worker.start()
+
+    def stop_export(self):
+        """Cancel a running export and wait for it to clean up its partial file"""
+        if self.export_worker:
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+            self.export_worker = None
+
+    def stop_tasks(self):
+        """Drop pending task results and let running writes finish before the service goes away"""
+        self.search_timer.stop()
+        self.tasks.cancel_all()
+        self.tasks.wait()
+
     def lock_diary(self):
         """Lock the diary and clear sensitive data"""
+        self.stop_indexing()
+        self.stop_export()
+        self.stop_tasks()
+        if self.unsubscribe:
+            self.unsubscribe()
+            self.unsubscribe = None
+        if self.diary_service:
+            self.diary_service.cleanup()
         self.diary_service = None
         self.current_password = None
-        self.sidebar.notes_list.clear()
+        self.sidebar.notes_model.clear()
         self.content_area.note_editor.clear()
         self.content_area.meta_label.clear()
         self.sidebar.stats_label.setText("0 notes")
@@ -258,6 +590,10 @@ class MainWindow(QMainWindow):
 
     def change_password(self):
         """Change the encryption password"""
+        if not self.diary_service:
+            QMessageBox.warning(self, "Error", "Diary is locked. Please authenticate.")
+            return
+            
         new_password, ok = QInputDialog.getText(
             self,
             "Change Password",
@@ -266,17 +602,67 @@ class MainWindow(QMainWindow):
         )
         
         if ok and new_password:
-            try:
-                if self.diary_service.change_password(self.current_password, new_password):
+            service = self.diary_service
+            old_password = self.current_password
+            
+            def change():
+                # Check the chain here too, so the status bar is not validated on the GUI thread
+                return service.change_password(old_password, new_password), service.is_chain_valid()
+            
+            def changed(result):
+                success, chain_valid = result
+                self.status_bar.showMessage("Ready")
+                if success:
                     self.current_password = new_password
                     QMessageBox.information(self, "Success", "Password changed successfully!")
-                    self.update_security_status()
-            except Exception as e:
-                QMessageBox.warning(self, "Error", str(e))
+                    self.update_security_status(chain_valid)
+            
+            def failed(message):
+                self.status_bar.showMessage("Ready")
+                QMessageBox.warning(self, "Error", message)
+            
+            # Re-wrapping the key derives two keys, which takes seconds
+            self.status_bar.showMessage("Changing password...")
+            self.tasks.submit(change, changed, failed, write=True)
+
+    def run_full_audit(self):
+        """Re-verify the whole chain from the genesis block"""
+        if not self.diary_service:
+            QMessageBox.warning(self, "Error", "Diary is locked. Please authenticate.")
+            return
+        
+        def audited(report):
+            self.status_bar.showMessage("Ready")
+            self.update_security_status(report.valid)
+            if report.valid:
+                QMessageBox.information(self, "Chain Audit",
+                    f"All {report.blocks_checked} blocks in the chain are valid.")
+                return
+            shown = report.failures[:AUDIT_FAILURES_SHOWN]
+            lines = [f"#{failure.index}: {failure.reason}" for failure in shown]
+            if len(report.failures) > len(shown):
+                lines.append(f"... and {len(report.failures) - len(shown)} more")
+            QMessageBox.warning(self, "Chain Audit",
+                f"The chain failed verification at {len(report.failures)} block(s):\n" + "\n".join(lines))
+        
+        def failed(message):
+            self.status_bar.showMessage("Ready")
+            logger.error(f"Error auditing chain: {message}")
+            QMessageBox.critical(self, "Error", message)
+        
+        # The audit runs in worker processes; the task only waits for them
+        self.status_bar.showMessage("Auditing chain...")
+        service = self.diary_service
+        self.tasks.submit(service.parallel_audit, audited, failed, channel="audit")
+
+    def show_diagnostics(self):
+        """Show operation and SQL timings collected by the metrics layer"""
+        from .diagnostics_dialog import DiagnosticsDialog
+        DiagnosticsDialog(self.diary_service, self).exec_()
 
-    def update_security_status(self):
-        """Update security indicator in status bar"""
-        if self.diary_service and self.diary_service.is_chain_valid():
+    def update_security_status(self, chain_valid=False):
+        """Update security indicator in status bar from a chain status checked off the GUI thread"""
+        if self.diary_service and chain_valid:
             status_text = "🔒 Secure | Chain Valid"
             style = "color: green; font-weight: bold;"
         else:
@@ -297,6 +683,9 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.Yes:
             # Clear sensitive data from memory
+            self.stop_indexing()
+            self.stop_export()
+            self.stop_tasks()
             if self.diary_service:
                 self.diary_service.cleanup()
             event.accept()
@@ -23,9 +23,11 @@ class MenuBar(QMenuBar):
         # Edit Menu
         edit_menu = self.addMenu("&Edit")
         self.find_action = QAction("&Find")
+        self.history_action = QAction("Note &History")
         self.prefs_action = QAction("&Preferences")
         
         edit_menu.addAction(self.find_action)
+        edit_menu.addAction(self.history_action)
         edit_menu.addSeparator()
         edit_menu.addAction(self.prefs_action)
         
@@ -33,6 +35,15 @@ class MenuBar(QMenuBar):
         security_menu = self.addMenu("&Security")
         self.change_pw_action = QAction("&Change Password")
         self.lock_action = QAction("&Lock Diary")
+        self.audit_action = QAction("&Full Chain Audit")
         
         security_menu.addAction(self.change_pw_action)
-        security_menu.addAction(self.lock_action)
\ No newline at end of file
+        security_menu.addAction(self.lock_action)
+        security_menu.addSeparator()
+        security_menu.addAction(self.audit_action)
+        
+        # Help Menu
+        help_menu = self.addMenu("&Help")
+        self.diagnostics_action = QAction("&Diagnostics")
+        
+        help_menu.addAction(self.diagnostics_action)
@@ -0,0 +1,192 @@
+import logging
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+
+logger = logging.getLogger(__name__)
+
+NOTE_INDEX_ROLE = Qt.UserRole
+PAGE_SIZE = 100
+
+class NotesListModel(QAbstractListModel):
+    """Notes list that fetches pages on demand and decrypts rows only when shown.
+
+    With a task runner, pages are fetched and previews decrypted in batches
+    on a pool thread, and rows show a placeholder until theirs arrives.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE, task_runner=None, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.task_runner = task_runner
+        self.diary_service = None
+        self.notes = []
+        self.exhausted = True
+        # Block contents never change, so previews stay valid for the service's lifetime
+        self.previews = {}
+        self._wanted = set()
+        self._requested = set()
+        # A page fetch is in flight; bumping the generation drops its result
+        self._fetching = False
+        self._generation = 0
+
+    def _reset_fetch(self):
+        self._fetching = False
+        self._generation += 1
+
+    def set_service(self, diary_service, first_page=None):
+        """Reset the model onto a service, optionally with an already fetched first page"""
+        self.beginResetModel()
+        if diary_service is not self.diary_service:
+            self.previews.clear()
+            self._wanted.clear()
+            self._requested.clear()
+        self._reset_fetch()
+        self.diary_service = diary_service
+        self.notes = list(first_page or [])
+        self.exhausted = diary_service is None or (
+            first_page is not None and len(first_page) < self.page_size
+        )
+        self.endResetModel()
+
+    def show_results(self, note_ids):
+        """Replace the paginated rows with a fixed list of search results"""
+        self.beginResetModel()
+        self._reset_fetch()
+        self.notes = [{"id": note_id} for note_id in note_ids]
+        self.exhausted = True
+        self.endResetModel()
+
+    def append_note(self, note):
+        """Add a new note's row, unless pagination will fetch it anyway"""
+        if not self.exhausted:
+            return
+        row = len(self.notes)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.notes.append({"id": note["id"], "date": note["date"]})
+        self.previews[note["id"]] = {"date": note["date"], "content": note["content"][:50]}
+        self.endInsertRows()
+
+    def remove_note(self, note_id):
+        """Drop the row of a deleted or superseded note"""
+        self.previews.pop(note_id, None)
+        for row, note in enumerate(self.notes):
+            if note["id"] == note_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.notes[row]
+                self.endRemoveRows()
+                return
+
+    def clear(self):
+        """Drop all rows and detach from the service"""
+        self.set_service(None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.notes)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self._fetching:
+            return
+
+        after_index = self.notes[-1]["id"] if self.notes else 0
+        service = self.diary_service
+        if self.task_runner is None:
+            try:
+                page = service.get_note_page(after_index, self.page_size)
+            except Exception as e:
+                logger.error(f"Error fetching notes after block {after_index}: {e}")
+                page = []
+            self._add_page(page)
+            return
+
+        # Scrolling keeps going while the page is read; rows are inserted when it arrives
+        self._fetching = True
+        generation = self._generation
+        self.task_runner.submit(
+            lambda: service.get_note_page(after_index, self.page_size),
+            lambda page: self._on_page(generation, page),
+            lambda message: self._on_page(generation, [], message)
+        )
+
+    def _on_page(self, generation, page, error=None):
+        if generation != self._generation:
+            # The model was reset while the page was being read
+            return
+        self._fetching = False
+        if error:
+            logger.error(f"Error fetching notes: {error}")
+        self._add_page(page)
+
+    def _add_page(self, page):
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+
+        self.beginInsertRows(QModelIndex(), len(self.notes), len(self.notes) + len(page) - 1)
+        self.notes.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.notes):
+            return None
+
+        note = self.notes[index.row()]
+        if role == Qt.DisplayRole:
+            preview = self._preview(note["id"])
+            if preview is None:
+                return f"{note.get('date', '')} - Loading..."
+            if not preview:
+                return f"{note.get('date', '')} - <unreadable>"
+            return f"{preview['date']} - {preview['content'][:50]}..."
+        if role == NOTE_INDEX_ROLE:
+            return note["id"]
+        return None
+
+    def _preview(self, note_id):
+        """Cached preview, False if unreadable, or None while it is being decrypted"""
+        if not self.diary_service:
+            return False
+        if note_id in self.previews:
+            return self.previews[note_id]
+        if self.task_runner is None:
+            self.previews[note_id] = self.diary_service.get_note_by_index(note_id) or False
+            return self.previews[note_id]
+        
+        if note_id not in self._requested:
+            if not self._wanted:
+                # Collect every row painted in this pass into one batch
+                QTimer.singleShot(0, self._request_previews)
+            self._wanted.add(note_id)
+        return None
+
+    def _request_previews(self):
+        """Decrypt the previews of newly shown rows on a pool thread"""
+        note_ids = sorted(self._wanted)
+        self._wanted.clear()
+        if not note_ids or not self.diary_service:
+            return
+        self._requested.update(note_ids)
+        service = self.diary_service
+        self.task_runner.submit(
+            lambda: service.get_note_previews(note_ids),
+            lambda previews: self._on_previews(service, note_ids, previews),
+            lambda message: self._on_previews(service, note_ids, {})
+        )
+
+    def _on_previews(self, service, note_ids, previews):
+        if service is not self.diary_service:
+            return
+        for note_id in note_ids:
+            self.previews[note_id] = previews.get(note_id, False)
+            self._requested.discard(note_id)
+        
+        updated = set(note_ids)
+        rows = [row for row, note in enumerate(self.notes) if note["id"] in updated]
+        if rows:
+            self.dataChanged.emit(self.index(rows[0]), self.index(rows[-1]), [Qt.DisplayRole])
@@ -1,6 +1,8 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListWidget, QLabel, QMenu
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListView, QLabel, QMenu
 from PyQt5.QtCore import Qt
 
+from .notes_model import NotesListModel
+
 class Sidebar(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -12,7 +14,11 @@ class Sidebar(QWidget):
         layout.addWidget(self.search_box)
         
         # Notes List
-        self.notes_list = QListWidget()
+        self.notes_model = NotesListModel(parent=self)
+        self.notes_list = QListView()
+        self.notes_list.setModel(self.notes_model)
+        # Uniform rows let the view lay out without asking for every row's text
+        self.notes_list.setUniformItemSizes(True)
         self.notes_list.setContextMenuPolicy(Qt.CustomContextMenu)
         layout.addWidget(self.notes_list)
         
@@ -23,5 +29,6 @@ class Sidebar(QWidget):
     def create_context_menu(self):
         menu = QMenu()
         menu.addAction("View Full Note")
+        menu.addAction("Note History")
         menu.addAction("Delete Note")
         return menu
\ No newline at end of file
@@ -0,0 +1,85 @@
+import itertools
+import logging
+from typing import Any, Callable, Optional
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+class Task(QRunnable):
+    """Run one call on a pool thread and report back through the runner's signal"""
+
+    def __init__(self, runner: "TaskRunner", task_id: int, function: Callable[[], Any]):
+        super().__init__()
+        self.runner = runner
+        self.task_id = task_id
+        self.function = function
+
+    def run(self):
+        try:
+            result = self.function()
+        except Exception as e:
+            logger.error(f"Background task failed: {e}")
+            self.runner.completed.emit(self.task_id, False, str(e))
+            return
+        self.runner.completed.emit(self.task_id, True, result)
+
+class TaskRunner(QObject):
+    """Run service calls off the GUI thread and hand their results back to it.
+
+    Reads share a pool; writes go through a single-thread pool so they hit
+    the chain one at a time, in submission order. Every task carries a
+    generation token: submitting to a channel supersedes the channel's
+    earlier tasks, and cancel_all() supersedes everything, so results that
+    arrive late are dropped instead of overwriting newer state.
+    """
+    completed = pyqtSignal(int, bool, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.read_pool = QThreadPool(self)
+        self.write_pool = QThreadPool(self)
+        self.write_pool.setMaxThreadCount(1)
+        self._ids = itertools.count(1)
+        self._epoch = 0
+        self._generations = {}
+        self._pending = {}
+        # Emitted from pool threads, delivered on the GUI thread
+        self.completed.connect(self._deliver)
+
+    def submit(self, function: Callable[[], Any], on_result: Callable[[Any], None],
+               on_error: Optional[Callable[[str], None]] = None,
+               channel: Optional[str] = None, write: bool = False) -> int:
+        """Queue a call; returns its generation on the channel"""
+        generation = self._generations.get(channel, 0) + 1
+        if channel is not None:
+            self._generations[channel] = generation
+        task_id = next(self._ids)
+        self._pending[task_id] = (self._epoch, channel, generation, on_result, on_error)
+        pool = self.write_pool if write else self.read_pool
+        pool.start(Task(self, task_id, function))
+        return generation
+
+    def is_current(self, channel: str, generation: int) -> bool:
+        return self._generations.get(channel) == generation
+
+    def cancel(self, channel: str):
+        """Drop the results of every task already queued on a channel"""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+
+    def cancel_all(self):
+        """Drop the results of every task already queued"""
+        self._epoch += 1
+
+    def wait(self):
+        """Block until every queued task has run"""
+        self.write_pool.waitForDone()
+        self.read_pool.waitForDone()
+
+    def _deliver(self, task_id: int, ok: bool, payload: Any):
+        epoch, channel, generation, on_result, on_error = self._pending.pop(task_id)
+        if epoch != self._epoch or (channel is not None and not self.is_current(channel, generation)):
+            return
+        if ok:
+            on_result(payload)
+        elif on_error:
+            on_error(payload)
@@ -0,0 +1,126 @@
+import logging
+from typing import TYPE_CHECKING
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .notes_model import PAGE_SIZE
+
+if TYPE_CHECKING:
+    from src.app.services.diary_service import DiaryService
+
+logger = logging.getLogger(__name__)
+
+class UnlockWorker(QThread):
+    """Derive the key and load the initial notebook state off the GUI thread"""
+    progress = pyqtSignal(int, str)
+    unlocked = pyqtSignal(object, dict)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, password: str, parent=None):
+        super().__init__(parent)
+        self._password = password
+
+    def run(self):
+        # SQLAlchemy, pycryptodome and the database are first loaded here, off the GUI thread
+        from src.app.services.diary_service import DiaryService
+        from src.core.crypto.keystore import UnlockCancelled
+
+        service = None
+        try:
+            # PBKDF2 runs as a single native call, so a cancel request is
+            # honoured as soon as it returns instead of mid-derivation. On a
+            # new notebook that is before the keystore and genesis block are
+            # written, so a cancelled password never becomes the real one.
+            self.progress.emit(0, "Deriving encryption key...")
+            try:
+                service = DiaryService(self._password, should_stop=self.isInterruptionRequested)
+            except UnlockCancelled:
+                self.cancelled.emit()
+                return
+            self._password = None
+            if self._abort(service):
+                return
+
+            self.progress.emit(60, "Loading notes...")
+            first_page = service.get_note_page(0, PAGE_SIZE)
+            # Warm the note cache so the first screen renders without decrypting
+            service.warm_cache([note["id"] for note in first_page])
+            if self._abort(service):
+                return
+
+            self.progress.emit(80, "Verifying chain...")
+            snapshot = {
+                "first_page": first_page,
+                "note_count": service.get_note_count(),
+                "chain_length": service.get_chain_length(),
+                "chain_valid": service.is_chain_valid()
+            }
+            if self._abort(service):
+                return
+
+            self.progress.emit(100, "Done")
+            self.unlocked.emit(service, snapshot)
+        except Exception as e:
+            logger.error(f"Unlock failed: {e}")
+            if service:
+                service.cleanup()
+            self.failed.emit(str(e))
+        finally:
+            self._password = None
+
+    def _abort(self, service: "DiaryService") -> bool:
+        """Drop the half-loaded service if the user cancelled"""
+        if not self.isInterruptionRequested():
+            return False
+        service.cleanup()
+        self.cancelled.emit()
+        return True
+
+class IndexWorker(QThread):
+    """Build the full-text search index off the GUI thread"""
+    indexed = pyqtSignal(int)
+
+    def __init__(self, diary_service: "DiaryService", parent=None):
+        super().__init__(parent)
+        self.diary_service = diary_service
+
+    def run(self):
+        try:
+            count = self.diary_service.build_search_index(self.isInterruptionRequested)
+            if not self.isInterruptionRequested():
+                self.indexed.emit(count)
+        except Exception as e:
+            logger.error(f"Search indexing failed: {e}")
+
+class ExportWorker(QThread):
+    """Stream every note to an export file off the GUI thread"""
+    progress = pyqtSignal(int, int)
+    exported = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, diary_service: "DiaryService", path: str, password: str = None, parent=None):
+        super().__init__(parent)
+        self.diary_service = diary_service
+        self.path = path
+        self._password = password
+
+    def run(self):
+        from src.app.services.exporter import export_notes, ExportCancelled
+
+        try:
+            count = export_notes(
+                self.diary_service,
+                self.path,
+                password=self._password,
+                progress=self.progress.emit,
+                should_stop=self.isInterruptionRequested
+            )
+            self.exported.emit(count)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            self.failed.emit(str(e))
+        finally:
+            self._password = None
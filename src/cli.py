@@ -0,0 +1,248 @@
+"""Command-line access to a notebook, for scripts and scheduled jobs.
+
+    python -m src.cli [--db PATH] [--password-fd FD] COMMAND ...
+
+The notebook password is read from the file descriptor given with
+--password-fd, or else from the first line of stdin (prompted for when
+stdin is a terminal). The key is derived once per run. Every command
+except `history --diff`, which prints a unified diff, writes JSON Lines
+to stdout, so large notebooks can be streamed through a pipe. Qt is
+never imported.
+"""
+import argparse
+import getpass
+import json
+import logging
+import os
+import sys
+from typing import Dict, Iterator, Optional
+
+from src.app.services.diary_service import DiaryService
+from src.core.database.session import DatabaseManager, PROFILES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/database.db"
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+def read_secret(fd: Optional[int], prompt: str) -> str:
+    """Read one line from a file descriptor, stdin, or the terminal"""
+    if fd is not None:
+        with os.fdopen(fd, 'r', closefd=False) as f:
+            secret = f.readline()
+    elif sys.stdin.isatty():
+        return getpass.getpass(prompt)
+    else:
+        secret = sys.stdin.readline()
+    secret = secret.rstrip("\r\n")
+    if not secret:
+        raise ValueError(f"No password given ({prompt.strip(': ')})")
+    return secret
+
+def emit(record: Dict):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def cmd_add(service: DiaryService, args) -> int:
+    content = sys.stdin.read() if args.content == "-" else args.content
+    if not content.strip():
+        raise ValueError("Note cannot be empty")
+    if not service.add_note(content):
+        return EXIT_FAILED
+    emit({"id": service.blockchain.tip_index})
+    return 0
+
+def cmd_list(service: DiaryService, args) -> int:
+    notes: Iterator[Dict]
+    if args.content:
+        notes = service.iter_notes(after_index=args.after)
+    else:
+        notes = iter_note_pages(service, args.after)
+    for count, note in enumerate(notes):
+        if args.limit is not None and count >= args.limit:
+            break
+        emit(note)
+    return 0
+
+def iter_note_pages(service: DiaryService, after_index: int) -> Iterator[Dict]:
+    """Index and date of every live note, without decrypting anything"""
+    while True:
+        page = service.get_note_page(after_index, 500)
+        if not page:
+            return
+        yield from page
+        after_index = page[-1]["id"]
+
+def cmd_get(service: DiaryService, args) -> int:
+    if not service.is_live_note(args.id):
+        logger.error(f"Block {args.id} is not a live note (see `history` for earlier revisions)")
+        return EXIT_FAILED
+    note = service.get_note_by_index(args.id)
+    if note is None:
+        logger.error(f"No readable note at block {args.id}")
+        return EXIT_FAILED
+    emit({"id": note["index"], "date": note["date"], "content": note["content"]})
+    return 0
+
+def cmd_history(service: DiaryService, args) -> int:
+    if args.diff:
+        sys.stdout.write("".join(line + "\n" for line in service.diff_revisions(args.id, *args.diff)))
+        return 0
+    history = service.get_note_history(args.id)
+    if not history:
+        logger.error(f"No note revisions recorded for block {args.id}")
+        return EXIT_FAILED
+    for revision in history:
+        emit(revision)
+    return 0
+
+def cmd_verify(service: DiaryService, args) -> int:
+    if args.parallel or args.workers:
+        report = service.parallel_audit(args.workers)
+        record = verification_record(report)
+        record["failures"] = [{"index": failure.index, "reason": failure.reason} for failure in report.failures]
+        emit(record)
+        return 0 if report.valid else EXIT_FAILED
+
+    if args.block is not None:
+        result = service.verify_block(args.block)
+    else:
+        result = service.verify_chain(full_audit=args.full)
+    emit(verification_record(result))
+    return 0 if result.valid else EXIT_FAILED
+
+def verification_record(result) -> Dict:
+    record = {"valid": result.valid, "blocks_checked": result.blocks_checked}
+    if result.first_break:
+        record["first_break"] = {"index": result.first_break.index, "reason": result.first_break.reason}
+    return record
+
+def cmd_prove(service: DiaryService, args) -> int:
+    proof = service.get_inclusion_proof(args.id)
+    if proof is None:
+        logger.error(f"Block {args.id} is not in a sealed Merkle range")
+        return EXIT_FAILED
+    emit(dict(proof.to_dict(), valid=proof.verify()))
+    return 0
+
+def cmd_rebuild_states(service: DiaryService, args) -> int:
+    emit({"block_states": service.rebuild_block_states()})
+    return 0
+
+def cmd_rebuild_checkpoints(service: DiaryService, args) -> int:
+    emit({"sealed_ranges": service.rebuild_merkle_checkpoints()})
+    return 0
+
+def cmd_export(service: DiaryService, args) -> int:
+    if args.path == "-":
+        for note in service.iter_notes():
+            emit(note)
+        return 0
+
+    from src.app.services.exporter import export_notes
+    password = read_secret(args.export_password_fd, "Export password: ") if args.encrypt else None
+    emit({"exported": export_notes(service, args.path, password=password), "path": args.path})
+    return 0
+
+def cmd_import(service: DiaryService, args) -> int:
+    from src.app.services.importer import import_path
+    emit({"imported": import_path(service, args.path, args.batch_size)})
+    return 0
+
+def cmd_stats(service: DiaryService, args) -> int:
+    emit({
+        "notes": service.get_note_count(),
+        "chain_length": service.get_chain_length(),
+        "db_path": service.db_manager.db_path,
+        "db_profile": service.db_manager.profile
+    })
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"notebook database (default {DEFAULT_DB_PATH})")
+    parser.add_argument("--db-profile", choices=list(PROFILES), help="SQLite performance profile")
+    parser.add_argument("--password-fd", type=int, help="read the password from this file descriptor")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add a note")
+    add.add_argument("content", help="note text, or - to read it from stdin")
+    add.set_defaults(run=cmd_add)
+
+    list_ = commands.add_parser("list", help="stream live notes")
+    list_.add_argument("--content", action="store_true", help="decrypt and include note content")
+    list_.add_argument("--after", type=int, default=0, help="start after this block index")
+    list_.add_argument("--limit", type=int)
+    list_.set_defaults(run=cmd_list)
+
+    get = commands.add_parser("get", help="print one note")
+    get.add_argument("id", type=int, help="block index of the note")
+    get.set_defaults(run=cmd_get)
+
+    history = commands.add_parser("history", help="list the revisions of a note")
+    history.add_argument("id", type=int, help="note ID or block index of any of its revisions")
+    history.add_argument("--diff", type=int, nargs=2, metavar=("OLD", "NEW"),
+                         help="print a unified diff between two revision numbers instead")
+    history.set_defaults(run=cmd_history)
+
+    verify = commands.add_parser("verify", help="verify the chain; exits 1 if it is broken")
+    verify.add_argument("--full", action="store_true", help="re-check from genesis, ignoring the checkpoint")
+    verify.add_argument("--block", type=int, help="verify only this block, through its Merkle checkpoint")
+    verify.add_argument("--parallel", action="store_true",
+                        help="full audit split across processes, listing every broken block")
+    verify.add_argument("--workers", type=int, help="processes for --parallel (default: one per CPU)")
+    verify.set_defaults(run=cmd_verify)
+
+    prove = commands.add_parser("prove", help="print the Merkle inclusion proof of a block")
+    prove.add_argument("id", type=int, help="block index")
+    prove.set_defaults(run=cmd_prove)
+
+    rebuild_states = commands.add_parser("rebuild-states",
+                                         help="recompute edited and deleted notes by decrypting the chain")
+    rebuild_states.set_defaults(run=cmd_rebuild_states)
+
+    rebuild = commands.add_parser("rebuild-checkpoints", help="recompute every Merkle checkpoint from the chain")
+    rebuild.set_defaults(run=cmd_rebuild_checkpoints)
+
+    export = commands.add_parser("export", help="export every note as JSON Lines")
+    export.add_argument("path", help="output file, or - for stdout")
+    export.add_argument("--encrypt", action="store_true", help="write an encrypted export")
+    export.add_argument("--export-password-fd", type=int,
+                        help="read the export password from this file descriptor (default: next stdin line)")
+    export.set_defaults(run=cmd_export)
+
+    import_ = commands.add_parser("import", help="import a JSONL file or a directory of .txt files")
+    import_.add_argument("path")
+    import_.add_argument("--batch-size", type=int, default=500)
+    import_.set_defaults(run=cmd_import)
+
+    stats = commands.add_parser("stats", help="note count and chain length")
+    stats.set_defaults(run=cmd_stats)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    service = None
+    try:
+        password = read_secret(args.password_fd, "Password: ")
+        db_manager = DatabaseManager(args.db, profile=args.db_profile)
+        service = DiaryService(password, db_manager=db_manager)
+        del password
+        return args.run(service, args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly without a second error at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if service:
+            service.cleanup()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Full chain audit split across processes.
+
+The blocks table is cut into index ranges. Each worker opens its own
+read-only SQLite connection and checks its range's hashes and internal
+links. The parent then checks the links across range boundaries. Every
+failure is collected, not just the first one.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+import multiprocessing
+import os
+import sqlite3
+
+from .block import Block
+from .chain import ChainBreak
+
+MIN_RANGE_SIZE = 1000
+RANGES_PER_WORKER = 4
+FETCH_SIZE = 1000
+
+class AuditReport:
+    """Every broken link found by a full audit"""
+
+    def __init__(self, failures: List[ChainBreak], blocks_checked: int, last: Optional[Tuple[int, str]] = None):
+        self.failures = failures
+        self.blocks_checked = blocks_checked
+        # (index, hash) of the last block read
+        self.last = last
+
+    @property
+    def valid(self) -> bool:
+        return not self.failures and self.blocks_checked > 0
+
+    @property
+    def first_break(self) -> Optional[ChainBreak]:
+        return self.failures[0] if self.failures else None
+
+    def __repr__(self):
+        return f"<AuditReport(blocks_checked={self.blocks_checked}, failures={len(self.failures)})>"
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+
+def _parse_timestamp(value) -> datetime:
+    """Turn SQLite's stored text back into the datetime that was hashed"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+def audit_range(db_path: str, start: int, end: int):
+    """Check blocks start..end on their own.
+
+    Returns (failures, blocks checked, first block, last block), where a
+    block is (index, previous_hash, current_hash), for the parent to check
+    the links into and out of the range.
+    """
+    connection = _connect(db_path)
+    try:
+        cursor = connection.execute(
+            'SELECT "index", timestamp, encrypted_data, previous_hash, current_hash FROM blocks '
+            'WHERE "index" BETWEEN ? AND ? ORDER BY "index"',
+            (start, end)
+        )
+        failures = []
+        checked = 0
+        first = previous = None
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for index, timestamp, encrypted_data, previous_hash, current_hash in rows:
+                if previous is not None:
+                    if index != previous[0] + 1:
+                        failures.append((previous[0] + 1, "block is missing"))
+                    elif previous_hash != previous[2]:
+                        failures.append((index, "previous hash does not match the preceding block"))
+                try:
+                    expected = Block.compute_hash(index, _parse_timestamp(timestamp), encrypted_data, previous_hash)
+                except (TypeError, ValueError) as e:
+                    failures.append((index, f"block cannot be hashed: {e}"))
+                else:
+                    if current_hash != expected:
+                        failures.append((index, "stored hash does not match block contents"))
+
+                previous = (index, previous_hash, current_hash)
+                if first is None:
+                    first = previous
+                checked += 1
+        return failures, checked, first, previous
+    finally:
+        connection.close()
+
+def split_ranges(first_index: int, last_index: int, workers: int) -> List[Tuple[int, int]]:
+    """Cut first..last into about RANGES_PER_WORKER ranges per worker"""
+    total = last_index - first_index + 1
+    size = max(MIN_RANGE_SIZE, -(-total // (workers * RANGES_PER_WORKER)))
+    return [(start, min(start + size - 1, last_index)) for start in range(first_index, last_index + 1, size)]
+
+def audit_chain(db_path: str, workers: Optional[int] = None) -> AuditReport:
+    """Audit the whole chain from genesis using a pool of worker processes"""
+    workers = workers or os.cpu_count() or 1
+    connection = _connect(db_path)
+    try:
+        last_index = connection.execute('SELECT MAX("index") FROM blocks').fetchone()[0]
+    finally:
+        connection.close()
+    if last_index is None:
+        return AuditReport([ChainBreak(0, "missing genesis block")], 0)
+
+    ranges = split_ranges(0, last_index, workers)
+    if workers == 1 or len(ranges) == 1:
+        results = [audit_range(db_path, start, end) for start, end in ranges]
+    else:
+        # Forking a process with other threads running (the GUI's task pool)
+        # can leave the children stuck on locks those threads held
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(audit_range, [db_path] * len(ranges),
+                                        [start for start, _ in ranges], [end for _, end in ranges]))
+
+    failures = []
+    checked = 0
+    previous = None
+    for (start, end), (range_failures, range_checked, first, last) in zip(ranges, results):
+        checked += range_checked
+        if first is None:
+            failures.append(ChainBreak(start, "block is missing"))
+            continue
+        # The link into this range, which its own worker could not see
+        if previous is None:
+            if first[0] != 0:
+                failures.append(ChainBreak(0, "missing genesis block"))
+        elif first[0] != previous[0] + 1:
+            failures.append(ChainBreak(previous[0] + 1, "block is missing"))
+        elif first[1] != previous[2]:
+            failures.append(ChainBreak(first[0], "previous hash does not match the preceding block"))
+        failures.extend(ChainBreak(index, reason) for index, reason in range_failures)
+        previous = last
+
+    failures.sort(key=lambda chain_break: chain_break.index)
+    return AuditReport(failures, checked, (previous[0], previous[2]) if previous else None)
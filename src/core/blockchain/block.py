@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Union
+import base64
 import hashlib
-import json
 from src.core.database.models import Base
 from src.core.crypto.aes_handler import AESHandler
-from sqlalchemy import Column, Integer, Text, String, DateTime
+from .payload import encode_payload, decode_payload
+from sqlalchemy import Column, Integer, LargeBinary, String, DateTime
 
 class Block(Base):
     __tablename__ = 'blocks'
@@ -13,7 +14,7 @@ class Block(Base):
     id = Column(Integer, primary_key=True)
     index = Column(Integer, unique=True, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
-    encrypted_data = Column(Text, nullable=False)
+    encrypted_data = Column(LargeBinary, nullable=False)
     previous_hash = Column(String(64), nullable=False)
     current_hash = Column(String(64), unique=True, nullable=False)
     
@@ -22,22 +23,37 @@ class Block(Base):
         self.timestamp = datetime.utcnow()
         self.previous_hash = previous_hash
         # Encrypt the data first
-        encrypted_data = crypto.encrypt(json.dumps(data))
-        self.encrypted_data = encrypted_data
+        self.encrypted_data = crypto.encrypt_envelope(encode_payload(data))
         # Calculate hash using the encrypted data
         self.current_hash = self.calculate_hash()
 
     def calculate_hash(self, data: Dict[str, Any] = None) -> str:
-        """Calculate hash with optional data parameter"""
-        if data is None:
-            # Use encrypted data if no data provided
-            data_str = self.encrypted_data
-        else:
-            data_str = json.dumps(data, sort_keys=True)
+        """Calculate block hash (the hash covers the encrypted data, so data is ignored)"""
+        return self.compute_hash(self.index, self.timestamp, self.encrypted_data, self.previous_hash)
 
-        raw_string = f"{self.index}{self.timestamp}{self.encrypted_data}{self.previous_hash}"
+    @staticmethod
+    def compute_hash(index: int, timestamp: datetime, encrypted_data: Union[bytes, str], previous_hash: str) -> str:
+        """Calculate a block hash from its stored columns"""
+        raw_string = f"{index}{timestamp}{Block.hashed_ciphertext(encrypted_data)}{previous_hash}"
         return hashlib.sha256(raw_string.encode()).hexdigest()
+
+    @staticmethod
+    def hashed_ciphertext(encrypted_data: Union[bytes, str]) -> str:
+        """Ciphertext as it enters the block hash.
+
+        Blocks used to store base64(nonce + tag + ciphertext) as text. A v1
+        binary envelope is hashed in that same text form, so hashes written
+        before the storage format changed remain valid.
+        """
+        if isinstance(encrypted_data, str):
+            return encrypted_data
+        return base64.b64encode(encrypted_data[1:]).decode('ascii')
     
     def get_decrypted_data(self, crypto) -> Dict[str, Any]:
         """Decrypt block data"""
-        return json.loads(crypto.decrypt(self.encrypted_data))
\ No newline at end of file
+        return self.decode_data(crypto.decrypt_envelope(self.encrypted_data))
+
+    @staticmethod
+    def decode_data(plaintext: Union[bytes, str]) -> Dict[str, Any]:
+        """Parse decrypted block data"""
+        return decode_payload(plaintext)
\ No newline at end of file
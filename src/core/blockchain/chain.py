@@ -1,68 +1,239 @@
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Dict, Any
+from sqlalchemy import exists, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from src.core.crypto.aes_handler import AESHandler
+from src.core.database.models import BlockState, MerkleCheckpoint, NoteRevision, ValidationCheckpoint
+from src.core.metrics import metrics, timed
 from .block import Block
+from .merkle import MerkleProof, merkle_path, merkle_root
 import logging
 
 logger = logging.getLogger(__name__)
 
+VALIDATION_BATCH_SIZE = 1000
+APPEND_BATCH_SIZE = 500
+APPEND_RETRIES = 3
+MERKLE_RANGE_SIZE = 1024
+# Unique columns that reject a block linked to a stale tip
+TIP_CONSTRAINTS = ("blocks.index", "blocks.current_hash")
+
+class ChainBreak:
+    """First broken link found while validating the chain"""
+
+    def __init__(self, index: int, reason: str):
+        self.index = index
+        self.reason = reason
+
+    def __repr__(self):
+        return f"<ChainBreak(index={self.index}, reason={self.reason!r})>"
+
+class ChainVerification:
+    """Outcome of a chain validation run"""
+
+    def __init__(self, first_break: Optional[ChainBreak] = None, blocks_checked: int = 0):
+        self.first_break = first_break
+        self.blocks_checked = blocks_checked
+
+    @property
+    def valid(self) -> bool:
+        return self.first_break is None
+
 class Blockchain:
-    def __init__(self, crypto: AESHandler, db_manager):
+    def __init__(self, crypto: AESHandler, db_manager, merkle_range_size: int = MERKLE_RANGE_SIZE):
         self.crypto = crypto
-        self.deleted_blocks = set()
         self.db_manager = db_manager
+        self.merkle_range_size = merkle_range_size
+        # (index, hash) of the last block; None means "look it up"
+        self._tip = None
         self._initialize_chain()
 
     def _initialize_chain(self):
         """Initialize blockchain with genesis block if needed"""
         session = self.db_manager.get_session()
         try:
-            if not self.get_latest_block(session):
+            last_block = self.get_latest_block(session)
+            if not last_block:
                 genesis_data = {"note": "Genesis Block"}
-                genesis_block = Block(
+                last_block = Block(
                     index=0,
                     data=genesis_data,
                     previous_hash="0",
                     crypto=self.crypto
                 )
-                session.add(genesis_block)
+                session.add(last_block)
                 session.commit()
+            self._tip = (last_block.index, last_block.current_hash)
         except Exception as e:
             session.rollback()
             logger.error(f"Chain initialization failed: {e}")
         finally:
             session.close()
 
+    @property
+    def tip_index(self) -> Optional[int]:
+        """Index of the last block, if known without a query"""
+        return self._tip[0] if self._tip else None
+
     def add_block(self, data: Dict[str, Any]) -> bool:
         """Add new block to blockchain"""
+        return self.append_block(data) is not None
+
+    @timed("blockchain.append_block")
+    def append_block(self, data: Dict[str, Any], supersedes: Optional[int] = None) -> Optional[int]:
+        """Add new block to blockchain and return its index.
+
+        When `supersedes` is given, the older block is marked as superseded
+        by the new one in the same transaction.
+        """
+        def append(session: Session) -> Optional[int]:
+            if supersedes is not None and not self._is_live_note(session, supersedes):
+                logger.error(f"Block {supersedes} is not a live note")
+                return None
+            
+            new_block = self._append(session, data)
+            if new_block is None:
+                return None
+            new_index = new_block.index
+            if supersedes is not None:
+                session.add(BlockState(block_index=supersedes, state=BlockState.SUPERSEDED, recorded_in=new_index))
+            if "content" in data:
+                self._record_revision(session, new_index, supersedes)
+            return new_index
+        
+        return self._write(append, "adding block")
+
+    @timed("blockchain.add_blocks")
+    def add_blocks(self, items: Iterable[Dict[str, Any]], batch_size: int = APPEND_BATCH_SIZE) -> List[int]:
+        """Append many blocks in a single transaction and return their indices.
+
+        The tip is looked up once and each new block is linked to the one
+        before it in memory. Blocks are flushed and released from the
+        session every `batch_size` items, so memory stays bounded however
+        long `items` is, and the whole import commits (and syncs) once.
+        """
         session = self.db_manager.get_session()
+        new_indices = []
         try:
+            # Read the tip from the database: a stream cannot be replayed on conflict
             last_block = self.get_latest_block(session)
             if not last_block:
                 logger.error("No last block found")
-                return False
-                
-            new_block = Block(
-                index=last_block.index + 1,
-                data=data,
-                previous_hash=last_block.current_hash,
-                crypto=self.crypto
-            )
+                return []
+            index, previous_hash = last_block.index, last_block.current_hash
             
-            session.add(new_block)
+            pending = 0
+            for data in items:
+                index += 1
+                block = Block(index=index, data=data, previous_hash=previous_hash, crypto=self.crypto)
+                previous_hash = block.current_hash
+                session.add(block)
+                if "content" in data:
+                    session.add(NoteRevision(block_index=index, note_id=index, revision=0))
+                new_indices.append(index)
+                pending += 1
+                if pending >= batch_size:
+                    session.flush()
+                    session.expunge_all()
+                    pending = 0
+            
+            session.flush()
+            self.seal_checkpoints(session)
             session.commit()
-            return True
+            self._tip = (index, previous_hash)
+            return new_indices
         except Exception as e:
             session.rollback()
-            logger.error(f"Error adding block: {e}")
-            return False
+            self._tip = None
+            logger.error(f"Error adding blocks: {e}")
+            return []
         finally:
             session.close()
 
+    @staticmethod
+    def _record_revision(session: Session, index: int, supersedes: Optional[int]):
+        """Index a note block as a new note, or as the next revision of the note it supersedes"""
+        if supersedes is None:
+            session.add(NoteRevision(block_index=index, note_id=index, revision=0))
+            return
+        previous = session.get(NoteRevision, supersedes)
+        if previous is None:
+            # Written before revisions were indexed and not backfilled yet
+            previous = NoteRevision(block_index=supersedes, note_id=supersedes, revision=0)
+            session.add(previous)
+        session.add(NoteRevision(block_index=index, note_id=previous.note_id, revision=previous.revision + 1))
+
+    def _write(self, operation: Callable[[Session], Any], action: str) -> Any:
+        """Run a chain write in its own transaction, retrying if another writer moved the tip.
+
+        Appends link to the cached tip without querying for it; if another
+        process appended in the meantime, the unique index/hash constraints
+        reject the insert and the write is retried against the fresh tip.
+        """
+        for _ in range(APPEND_RETRIES):
+            session = self.db_manager.get_session()
+            try:
+                result = operation(session)
+                session.commit()
+                if "tip" in session.info:
+                    self._tip = session.info["tip"]
+                return result
+            except IntegrityError as e:
+                session.rollback()
+                self._tip = None
+                if not self._is_tip_conflict(e):
+                    # A real constraint violation; retrying would only hide it
+                    logger.error(f"Error {action}: {e.orig}")
+                    return None
+                metrics.increment("blockchain.append_retries")
+                logger.warning(f"Chain changed while {action}, retrying: {e.orig}")
+            except Exception as e:
+                session.rollback()
+                self._tip = None
+                logger.error(f"Error {action}: {e}")
+                return None
+            finally:
+                session.info.pop("tip", None)
+                session.close()
+        
+        logger.error(f"Error {action}: chain kept changing after {APPEND_RETRIES} attempts")
+        return None
+
+    @staticmethod
+    def _is_tip_conflict(error: IntegrityError) -> bool:
+        """Whether the insert lost a race for the next block rather than broke another constraint"""
+        message = str(error.orig)
+        return any(column in message for column in TIP_CONSTRAINTS)
+
+    def _append(self, session: Session, data: Dict[str, Any]) -> Optional[Block]:
+        """Link a new block to the tip inside the caller's transaction"""
+        tip = self._tip
+        if tip is None:
+            last_block = self.get_latest_block(session)
+            if not last_block:
+                logger.error("No last block found")
+                return None
+            tip = (last_block.index, last_block.current_hash)
+            
+        new_block = Block(
+            index=tip[0] + 1,
+            data=data,
+            previous_hash=tip[1],
+            crypto=self.crypto
+        )
+        session.add(new_block)
+        session.flush()
+        session.info["tip"] = (new_block.index, new_block.current_hash)
+        if (new_block.index + 1) % self.merkle_range_size == 0:
+            self.seal_checkpoints(session)
+        return new_block
+
     def get_latest_block(self, session: Session) -> Optional[Block]:
         """Get latest block from blockchain"""
         return session.query(Block).order_by(Block.index.desc()).first()
 
+    @timed("blockchain.get_block_by_index")
     def get_block_by_index(self, index: int, session: Session = None) -> Optional[Block]:
         """Get block by index with optional session management"""
         should_close = False
@@ -83,48 +254,469 @@ class Blockchain:
             if should_close:
                 session.close()
 
+    @timed("blockchain.mark_as_deleted")
     def mark_as_deleted(self, index: int) -> bool:
-        """Mark block as deleted (soft delete)"""
+        """Mark block as deleted (soft delete).
+
+        The deletion is recorded as an encrypted tombstone block, so it is
+        part of the tamper-evident chain; block_states only indexes it.
+        """
         if index <= 0:
             return False
+        
+        def delete(session: Session) -> bool:
+            if not self._is_live_note(session, index):
+                return False
             
-        self.deleted_blocks.add(index)
+            tombstone = self._append(session, {"tombstone": index})
+            if tombstone is None:
+                return False
+            tombstone_index = tombstone.index
+            session.add_all([
+                BlockState(block_index=index, state=BlockState.DELETED, recorded_in=tombstone_index),
+                BlockState(block_index=tombstone_index, state=BlockState.TOMBSTONE, recorded_in=tombstone_index)
+            ])
+            return True
+        
+        return bool(self._write(delete, f"deleting block {index}"))
+
+    @staticmethod
+    def _live_notes(query):
+        """Restrict a block query to live notes: no genesis, no deleted, superseded or tombstone blocks"""
+        return query.filter(
+            Block.index > 0,
+            ~exists().where(BlockState.block_index == Block.index)
+        )
+
+    def _is_live_note(self, session: Session, index: int) -> bool:
+        return self._live_notes(session.query(Block.index)).filter(Block.index == index).first() is not None
+
+    def is_live_note(self, index: int) -> bool:
+        """Whether a block holds a note that is neither edited nor deleted (and is not genesis or a tombstone)"""
+        session = self.db_manager.get_session()
+        try:
+            return self._is_live_note(session, index)
+        finally:
+            session.close()
+
+    def states_missing(self) -> bool:
+        """True when block_states is empty although the chain holds an edit or a deletion.
+
+        Expects note_revisions to be complete: an edit shows up there as a
+        revision above 0, and a tombstone as a block that is not a note.
+        Notebooks written before block_states existed are caught this way
+        without decrypting anything.
+        """
+        session = self.db_manager.get_session()
+        try:
+            if session.query(BlockState.block_index).first() is not None:
+                return False
+            edited = session.query(NoteRevision.block_index).filter(NoteRevision.revision > 0).first()
+            unindexed = (session.query(Block.index)
+                         .filter(Block.index > 0, ~exists().where(NoteRevision.block_index == Block.index))
+                         .first())
+            return edited is not None or unindexed is not None
+        finally:
+            session.close()
+
+    @timed("blockchain.rebuild_block_states")
+    def rebuild_block_states(self) -> int:
+        """Rebuild block_states by decrypting the whole chain; returns the number of rows written"""
+        session = self.db_manager.get_session()
+        try:
+            session.query(BlockState).delete()
+            states = {}
+            for block in session.query(Block).filter(Block.index > 0).order_by(Block.index).yield_per(VALIDATION_BATCH_SIZE):
+                data = block.get_decrypted_data(self.crypto)
+                if "tombstone" in data:
+                    states[data["tombstone"]] = (BlockState.DELETED, block.index)
+                    states[block.index] = (BlockState.TOMBSTONE, block.index)
+                elif "updated_from" in data:
+                    states.setdefault(data["updated_from"], (BlockState.SUPERSEDED, block.index))
+            session.add_all(
+                BlockState(block_index=index, state=state, recorded_in=recorded_in)
+                for index, (state, recorded_in) in states.items()
+            )
+            session.commit()
+            return len(states)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def revisions_missing(self) -> bool:
+        """True when the chain holds notes but note_revisions is empty, e.g. a database from before it existed"""
+        session = self.db_manager.get_session()
+        try:
+            return (session.query(NoteRevision.block_index).first() is None
+                    and session.query(Block.index).filter(Block.index > 0).first() is not None)
+        finally:
+            session.close()
+
+    @timed("blockchain.rebuild_note_revisions")
+    def rebuild_note_revisions(self) -> int:
+        """Rebuild note_revisions by decrypting the chain once and following `updated_from`; returns the rows written"""
+        session = self.db_manager.get_session()
+        try:
+            session.query(NoteRevision).delete()
+            revisions = {}
+            superseded = set()
+            for block in session.query(Block).filter(Block.index > 0).order_by(Block.index).yield_per(VALIDATION_BATCH_SIZE):
+                data = block.get_decrypted_data(self.crypto)
+                if "content" not in data:
+                    continue
+                updated_from = data.get("updated_from")
+                previous = revisions.get(updated_from)
+                # Only the first update of a block continues its note, as in rebuild_block_states
+                if previous is not None and updated_from not in superseded:
+                    superseded.add(updated_from)
+                    revisions[block.index] = (previous[0], previous[1] + 1)
+                else:
+                    revisions[block.index] = (block.index, 0)
+            session.add_all(
+                NoteRevision(block_index=index, note_id=note_id, revision=revision)
+                for index, (note_id, revision) in revisions.items()
+            )
+            session.commit()
+            return len(revisions)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _note_of(session: Session, index: int):
+        """Subquery for the note ID of the block holding any of its revisions"""
+        return session.query(NoteRevision.note_id).filter(NoteRevision.block_index == index).scalar_subquery()
+
+    def get_note_id(self, index: int) -> Optional[int]:
+        """Stable ID of the note whose revision is held in block `index`"""
+        session = self.db_manager.get_session()
+        try:
+            return session.query(NoteRevision.note_id).filter(NoteRevision.block_index == index).scalar()
+        finally:
+            session.close()
+
+    def get_note_revisions(self, session: Session, index: int) -> List[Any]:
+        """Every revision of the note holding block `index`, oldest first, in one indexed query"""
+        return (session.query(NoteRevision.note_id, NoteRevision.revision, NoteRevision.block_index, Block.timestamp)
+                .join(Block, Block.index == NoteRevision.block_index)
+                .filter(NoteRevision.note_id == self._note_of(session, index))
+                .order_by(NoteRevision.revision)
+                .all())
+
+    def get_revision_index(self, session: Session, index: int, revision: Optional[int] = None) -> Optional[int]:
+        """Block index of one revision (the latest by default) of the note holding block `index`"""
+        query = session.query(NoteRevision.block_index).filter(NoteRevision.note_id == self._note_of(session, index))
+        if revision is None:
+            query = query.order_by(NoteRevision.revision.desc())
+        else:
+            query = query.filter(NoteRevision.revision == revision)
+        return query.limit(1).scalar()
+
+    def is_chain_valid(self, session: Session = None, full_audit: bool = False) -> bool:
+        """Validate blockchain integrity from the verified checkpoint, or from genesis on a full audit"""
+        return self.verify_chain(session, full_audit=full_audit).valid
+
+    @timed("blockchain.verify_chain")
+    def verify_chain(self, session: Session = None, full_audit: bool = False,
+                     batch_size: int = VALIDATION_BATCH_SIZE) -> ChainVerification:
+        """Stream the chain in index order and report the first broken link.
+
+        Only the hashed columns are read and no block is decrypted, so memory
+        use does not depend on chain length.
+        """
+        should_close = False
+        if session is None:
+            session = self.db_manager.get_session()
+            should_close = True
+        
+        try:
+            checkpoint = session.query(ValidationCheckpoint).first()
+            previous = None
+            if checkpoint and not full_audit:
+                previous = self._hash_columns(session).filter(Block.index == checkpoint.verified_index).first()
+                # The verified history must still end in the block we checked last time
+                if (previous is None or previous.current_hash != checkpoint.verified_hash
+                        or previous.current_hash != Block.compute_hash(*previous[:4])):
+                    logger.warning(f"Verified checkpoint at block {checkpoint.verified_index} no longer matches")
+                    return ChainVerification(ChainBreak(checkpoint.verified_index, "verified checkpoint no longer matches"))
+            
+            rows = self._hash_columns(session).order_by(Block.index)
+            if previous is not None:
+                rows = rows.filter(Block.index > previous.index)
+            
+            checked = 0
+            for row in rows.yield_per(batch_size):
+                chain_break = self._check_link(row, previous)
+                if chain_break:
+                    logger.warning(f"Chain broken at block {chain_break.index}: {chain_break.reason}")
+                    return ChainVerification(chain_break, checked)
+                previous = row
+                checked += 1
+            
+            if previous is None:
+                return ChainVerification(ChainBreak(0, "missing genesis block"))
+            
+            self._save_checkpoint(session, checkpoint, previous.index, previous.current_hash)
+            return ChainVerification(None, checked)
+        finally:
+            if should_close:
+                session.close()
+
+    @timed("blockchain.parallel_audit")
+    def parallel_audit(self, workers: Optional[int] = None):
+        """Full audit from genesis spread over worker processes, reporting every broken link"""
+        from .audit import audit_chain
+        report = audit_chain(self.db_manager.db_path, workers)
+        for chain_break in report.failures:
+            logger.warning(f"Chain broken at block {chain_break.index}: {chain_break.reason}")
+        if report.valid:
+            session = self.db_manager.get_session()
+            try:
+                self._save_checkpoint(session, session.query(ValidationCheckpoint).first(), *report.last)
+            finally:
+                session.close()
+        return report
+
+    def seal_checkpoints(self, session: Session) -> int:
+        """Add a Merkle checkpoint for every full range after the last one; the caller commits"""
+        last_end = session.query(func.max(MerkleCheckpoint.range_end)).scalar()
+        start = 0 if last_end is None else last_end + 1
+        tip = session.query(func.max(Block.index)).scalar()
+        sealed = 0
+        while tip is not None and start + self.merkle_range_size - 1 <= tip:
+            if not self._seal_range(session, start, start + self.merkle_range_size - 1):
+                break
+            sealed += 1
+            start += self.merkle_range_size
+        return sealed
+
+    def _seal_range(self, session: Session, start: int, end: int) -> bool:
+        """Checkpoint one range, refusing to vouch for a range whose links do not hold"""
+        previous = self._hash_columns(session).filter(Block.index == start - 1).first() if start > 0 else None
+        rows = self._hash_columns(session).filter(Block.index.between(start, end)).order_by(Block.index).all()
+        if start > 0 and previous is None:
+            logger.error(f"Cannot seal blocks {start}-{end}: block {start - 1} is missing")
+            return False
+        for row in rows:
+            chain_break = self._check_link(row, previous)
+            if chain_break:
+                logger.error(f"Cannot seal blocks {start}-{end}: block {chain_break.index}: {chain_break.reason}")
+                return False
+            previous = row
+        if len(rows) != end - start + 1:
+            return False
+        
+        session.add(MerkleCheckpoint(range_start=start, range_end=end,
+                                     root=merkle_root([row.current_hash for row in rows])))
         return True
 
-    def is_chain_valid(self, session: Session = None) -> bool:
-        """Validate blockchain integrity"""
+    @timed("blockchain.rebuild_merkle_checkpoints")
+    def rebuild_merkle_checkpoints(self) -> int:
+        """Recompute every Merkle checkpoint from the chain; returns the number of ranges sealed"""
+        session = self.db_manager.get_session()
+        try:
+            session.query(MerkleCheckpoint).delete()
+            sealed = self.seal_checkpoints(session)
+            session.commit()
+            return sealed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _checkpoint_for(self, session: Session, index: int) -> Optional[MerkleCheckpoint]:
+        checkpoint = (session.query(MerkleCheckpoint)
+                      .filter(MerkleCheckpoint.range_start <= index)
+                      .order_by(MerkleCheckpoint.range_start.desc())
+                      .first())
+        if checkpoint is None or checkpoint.range_end < index:
+            return None
+        return checkpoint
+
+    def get_inclusion_proof(self, index: int, session: Session = None) -> Optional[MerkleProof]:
+        """Merkle proof that a block belongs to its sealed range, or None if the range is not sealed"""
         should_close = False
         if session is None:
             session = self.db_manager.get_session()
             should_close = True
         
         try:
-            blocks = session.query(Block).order_by(Block.index).all()
+            checkpoint = self._checkpoint_for(session, index)
+            if checkpoint is None:
+                return None
+            hashes = [block_hash for (block_hash,) in session.query(Block.current_hash)
+                      .filter(Block.index.between(checkpoint.range_start, checkpoint.range_end))
+                      .order_by(Block.index)]
+            if len(hashes) != checkpoint.range_end - checkpoint.range_start + 1:
+                logger.warning(f"Blocks are missing from sealed range {checkpoint.range_start}-{checkpoint.range_end}")
+                return None
+            position = index - checkpoint.range_start
+            return MerkleProof(index, hashes[position], checkpoint.range_start, checkpoint.range_end,
+                               checkpoint.root, merkle_path(hashes, position))
+        finally:
+            if should_close:
+                session.close()
+
+    @timed("blockchain.verify_block")
+    def verify_block(self, index: int, session: Session = None) -> ChainVerification:
+        """Verify one block without walking the chain.
+
+        A block in a sealed range is checked against its own contents and
+        its range's Merkle root. A block past the last checkpoint is linked
+        back to the end of the last sealed range, so at most one range of
+        blocks is read either way.
+        """
+        should_close = False
+        if session is None:
+            session = self.db_manager.get_session()
+            should_close = True
+        
+        try:
+            row = self._hash_columns(session).filter(Block.index == index).first()
+            if row is None:
+                return ChainVerification(ChainBreak(index, "block is missing"))
+            if row.current_hash != Block.compute_hash(row.index, row.timestamp, row.encrypted_data, row.previous_hash):
+                return ChainVerification(ChainBreak(index, "stored hash does not match block contents"), 1)
             
-            for i in range(1, len(blocks)):
-                current = blocks[i]
-                previous = blocks[i-1]
-                
-                if current.index in self.deleted_blocks:
-                    continue
-                    
-                # Get decrypted data for validation
-                current_data = current.get_decrypted_data(self.crypto)
-                if current.current_hash != current.calculate_hash(current_data):
-                    return False
-                    
-                if current.previous_hash != previous.current_hash:
-                    return False
-                    
-            return True
+            proof = self.get_inclusion_proof(index, session)
+            if proof is not None:
+                if not proof.verify(row.current_hash):
+                    return ChainVerification(ChainBreak(index, "block does not match its Merkle checkpoint"), 1)
+                return ChainVerification(None, 1)
+            
+            # Not sealed yet: walk forward from the end of the last sealed range
+            last_end = (session.query(func.max(MerkleCheckpoint.range_end))
+                        .filter(MerkleCheckpoint.range_end < index).scalar())
+            previous = None
+            if last_end is not None:
+                anchor = self.get_inclusion_proof(last_end, session)
+                if anchor is None or not anchor.verify():
+                    return ChainVerification(ChainBreak(last_end, "block does not match its Merkle checkpoint"))
+                previous = self._hash_columns(session).filter(Block.index == last_end).first()
+            
+            rows = (self._hash_columns(session)
+                    .filter(Block.index > (last_end if last_end is not None else -1), Block.index <= index)
+                    .order_by(Block.index))
+            checked = 0
+            for row in rows.yield_per(VALIDATION_BATCH_SIZE):
+                chain_break = self._check_link(row, previous)
+                if chain_break:
+                    return ChainVerification(chain_break, checked)
+                previous = row
+                checked += 1
+            return ChainVerification(None, checked)
+        finally:
+            if should_close:
+                session.close()
+
+    @timed("blockchain.verify_range")
+    def verify_range(self, range_start: int, session: Session = None) -> ChainVerification:
+        """Check one sealed range on its own: block hashes, internal links and Merkle root"""
+        should_close = False
+        if session is None:
+            session = self.db_manager.get_session()
+            should_close = True
+        
+        try:
+            checkpoint = session.get(MerkleCheckpoint, range_start)
+            if checkpoint is None:
+                return ChainVerification(ChainBreak(range_start, "no Merkle checkpoint starts here"))
+            rows = (self._hash_columns(session)
+                    .filter(Block.index.between(checkpoint.range_start, checkpoint.range_end))
+                    .order_by(Block.index).all())
+            previous = None
+            for checked, row in enumerate(rows):
+                if previous is None:
+                    # The link into the range belongs to the previous range's check
+                    if row.index != range_start:
+                        return ChainVerification(ChainBreak(range_start, "block is missing"), checked)
+                    if row.current_hash != Block.compute_hash(*row[:4]):
+                        return ChainVerification(ChainBreak(row.index, "stored hash does not match block contents"), checked)
+                else:
+                    chain_break = self._check_link(row, previous)
+                    if chain_break:
+                        return ChainVerification(chain_break, checked)
+                previous = row
+            if len(rows) != checkpoint.range_end - checkpoint.range_start + 1:
+                missing = previous.index + 1 if previous else range_start
+                return ChainVerification(ChainBreak(missing, "block is missing"), len(rows))
+            if merkle_root([row.current_hash for row in rows]) != checkpoint.root:
+                return ChainVerification(ChainBreak(range_start, "range does not match its Merkle checkpoint"), len(rows))
+            return ChainVerification(None, len(rows))
         finally:
             if should_close:
                 session.close()
 
+    @staticmethod
+    def _hash_columns(session: Session):
+        """Query only the columns covered by the block hash"""
+        return session.query(Block.index, Block.timestamp, Block.encrypted_data,
+                             Block.previous_hash, Block.current_hash)
+
+    @staticmethod
+    def _check_link(row, previous) -> Optional[ChainBreak]:
+        """Check one block's own hash and its link to the previous block"""
+        if previous is None:
+            if row.index != 0:
+                return ChainBreak(row.index, "missing genesis block")
+        elif row.index != previous.index + 1:
+            return ChainBreak(previous.index + 1, "block is missing")
+        elif row.previous_hash != previous.current_hash:
+            return ChainBreak(row.index, "previous hash does not match the preceding block")
+        
+        if row.current_hash != Block.compute_hash(row.index, row.timestamp, row.encrypted_data, row.previous_hash):
+            return ChainBreak(row.index, "stored hash does not match block contents")
+        return None
+
+    def _save_checkpoint(self, session: Session, checkpoint: Optional[ValidationCheckpoint],
+                         index: int, block_hash: str):
+        """Persist the highest verified block"""
+        try:
+            if checkpoint is None:
+                checkpoint = ValidationCheckpoint(verified_index=index, verified_hash=block_hash)
+                session.add(checkpoint)
+            elif checkpoint.verified_index == index and checkpoint.verified_hash == block_hash:
+                return
+            else:
+                checkpoint.verified_index = index
+                checkpoint.verified_hash = block_hash
+                checkpoint.verified_at = datetime.utcnow()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving validation checkpoint: {e}")
+
     def get_all_blocks(self, session: Session) -> List[Block]:
         """Get all blocks from blockchain"""
         return session.query(Block).order_by(Block.index).all()
 
+    def get_blocks_by_indices(self, session: Session, indices: List[int]) -> List[Block]:
+        """Get the blocks with the given indices in index order"""
+        if not indices:
+            return []
+        return session.query(Block).filter(Block.index.in_(indices)).order_by(Block.index).all()
+
+    def get_live_note_blocks(self, session: Session) -> List[Block]:
+        """Get every live note block in index order"""
+        return self._live_notes(session.query(Block)).order_by(Block.index).all()
+
+    def get_note_page(self, session: Session, after_index: int = 0, limit: int = 100) -> List[Any]:
+        """Get index and timestamp of the next page of live note blocks (keyset pagination on index)"""
+        return (self._live_notes(session.query(Block.index, Block.timestamp))
+                .filter(Block.index > after_index)
+                .order_by(Block.index)
+                .limit(limit)
+                .all())
+
+    def count_notes(self, session: Session) -> int:
+        """Count live note blocks (excluding genesis)"""
+        return self._live_notes(session.query(Block.index)).count()
+
     def get_chain_length(self, session: Session = None) -> int:
         """Get blockchain length with optional session parameter"""
         should_close = False
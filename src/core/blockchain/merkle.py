@@ -0,0 +1,76 @@
+from typing import List, Tuple
+import hashlib
+
+# Domain-separate leaves from inner nodes so a node can never pass for a leaf
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def leaf_hash(block_hash: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(block_hash)).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    # An odd node out is carried up unchanged rather than paired with itself
+    paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        paired.append(level[-1])
+    return paired
+
+def merkle_root(block_hashes: List[str]) -> str:
+    """Root over a range of block hashes, in index order"""
+    if not block_hashes:
+        raise ValueError("Cannot build a Merkle root over no blocks")
+    level = [leaf_hash(block_hash) for block_hash in block_hashes]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+def merkle_path(block_hashes: List[str], position: int) -> List[Tuple[bool, str]]:
+    """Sibling hashes from a leaf up to the root, each flagged True when it sits on the left"""
+    level = [leaf_hash(block_hash) for block_hash in block_hashes]
+    path = []
+    while len(level) > 1:
+        sibling = position ^ 1
+        if sibling < len(level):
+            path.append((sibling < position, level[sibling].hex()))
+        position //= 2
+        level = _next_level(level)
+    return path
+
+def root_from_path(block_hash: str, path: List[Tuple[bool, str]]) -> str:
+    """Fold a block hash up its path; equals the range root if the block is included"""
+    node = leaf_hash(block_hash)
+    for is_left, sibling in path:
+        sibling = bytes.fromhex(sibling)
+        node = node_hash(sibling, node) if is_left else node_hash(node, sibling)
+    return node.hex()
+
+class MerkleProof:
+    """Inclusion proof of one block in a sealed checkpoint range"""
+
+    def __init__(self, index: int, block_hash: str, range_start: int, range_end: int,
+                 root: str, path: List[Tuple[bool, str]]):
+        self.index = index
+        self.block_hash = block_hash
+        self.range_start = range_start
+        self.range_end = range_end
+        self.root = root
+        self.path = path
+
+    def verify(self, block_hash: str = None) -> bool:
+        """Check the proof, optionally for a block hash computed independently"""
+        return root_from_path(block_hash or self.block_hash, self.path) == self.root
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "block_hash": self.block_hash,
+            "range": [self.range_start, self.range_end],
+            "root": self.root,
+            "path": [{"left": is_left, "hash": sibling} for is_left, sibling in self.path]
+        }
+
+    def __repr__(self):
+        return f"<MerkleProof(index={self.index}, range={self.range_start}-{self.range_end}, steps={len(self.path)})>"
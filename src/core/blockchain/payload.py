@@ -0,0 +1,29 @@
+from typing import Any, Dict, Union
+import json
+import zlib
+
+PAYLOAD_JSON = 0x01
+PAYLOAD_ZLIB_JSON = 0x02
+COMPRESSION_THRESHOLD = 512
+COMPRESSION_LEVEL = 6
+
+def encode_payload(data: Dict[str, Any], threshold: int = COMPRESSION_THRESHOLD) -> bytes:
+    """Serialize block data behind a one-byte format header, compressing large payloads"""
+    raw = json.dumps(data).encode('utf-8')
+    if len(raw) >= threshold:
+        compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+        if len(compressed) < len(raw):
+            return bytes([PAYLOAD_ZLIB_JSON]) + compressed
+    return bytes([PAYLOAD_JSON]) + raw
+
+def decode_payload(plaintext: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse decrypted block data in any payload format, including headerless legacy JSON"""
+    if isinstance(plaintext, str) or plaintext[:1] == b'{':
+        return json.loads(plaintext)
+    
+    payload_format, body = plaintext[0], plaintext[1:]
+    if payload_format == PAYLOAD_JSON:
+        return json.loads(body)
+    if payload_format == PAYLOAD_ZLIB_JSON:
+        return json.loads(zlib.decompress(body))
+    raise ValueError(f"Unknown payload format: {payload_format}")
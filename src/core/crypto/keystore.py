@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Callable, Optional
+import logging
+import os
+
+from sqlalchemy.exc import IntegrityError
+
+from src.core.database.models import KeyStoreRecord
+from .aes_handler import AESHandler
+from .key_derivation import derive_key
+
+logger = logging.getLogger(__name__)
+
+KDF_NAME = "pbkdf2-sha512"
+SALT_SIZE = 16
+KEY_SIZE = 32
+WRAP_CONTEXT = b"cryptonote-keystore-v1"
+# Notebooks created before the keystore derived their key with this salt
+LEGACY_SALT = b'\x00' * 16
+# The keystore is a single row; a second first-run insert collides on this key
+KEYSTORE_ID = 1
+
+class UnlockCancelled(Exception):
+    """Raised when a first unlock is cancelled before the keystore is written"""
+
+class KeyStore:
+    """Random data-encryption key (DEK) wrapped by a password-derived key (KEK).
+
+    Blocks are encrypted with the DEK, so changing the password only
+    re-wraps these 32 bytes under a new salt instead of re-encrypting the
+    whole chain.
+    """
+
+    def __init__(self, db_manager, kdf: Callable[[str, bytes], bytes] = derive_key):
+        self.db_manager = db_manager
+        self.kdf = kdf
+
+    def exists(self) -> bool:
+        session = self.db_manager.get_session()
+        try:
+            return session.get(KeyStoreRecord, KEYSTORE_ID) is not None
+        finally:
+            session.close()
+
+    def unlock(self, password: str) -> bytes:
+        """Unwrap the DEK with the password"""
+        session = self.db_manager.get_session()
+        try:
+            record = session.get(KeyStoreRecord, KEYSTORE_ID)
+            if record is None:
+                raise ValueError("Keystore has not been created")
+            return self._unwrap(record, password)
+        finally:
+            session.close()
+
+    def create(self, password: str, data_key: bytes = None,
+               should_stop: Optional[Callable[[], bool]] = None) -> bytes:
+        """Store a DEK wrapped with the password, generating a random one if none is given.
+
+        `should_stop` is checked once the slow key derivation is done; if it
+        returns True, UnlockCancelled is raised and nothing is written.
+        """
+        data_key = data_key or os.urandom(KEY_SIZE)
+        salt, wrapped_key = self._wrap(password, data_key)
+        if should_stop and should_stop():
+            raise UnlockCancelled("Unlock cancelled")
+        session = self.db_manager.get_session()
+        try:
+            # Another first unlock may have won the race since exists() was checked
+            if session.get(KeyStoreRecord, KEYSTORE_ID) is None:
+                session.add(KeyStoreRecord(id=KEYSTORE_ID, kdf=KDF_NAME, salt=salt, wrapped_key=wrapped_key))
+                session.commit()
+                return data_key
+        except IntegrityError:
+            session.rollback()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        logger.info("Keystore was created concurrently; unlocking it instead")
+        return self.unlock(password)
+
+    def derive_legacy_key(self, password: str) -> bytes:
+        """Key that pre-keystore notebooks used directly for their blocks"""
+        return self.kdf(password, LEGACY_SALT)
+
+    def change_password(self, old_password: str, new_password: str) -> bool:
+        """Re-wrap the DEK under a new password and a fresh salt"""
+        session = self.db_manager.get_session()
+        try:
+            record = session.get(KeyStoreRecord, KEYSTORE_ID)
+            if record is None:
+                raise ValueError("Keystore has not been created")
+            data_key = self._unwrap(record, old_password)
+            record.salt, record.wrapped_key = self._wrap(new_password, data_key)
+            record.kdf = KDF_NAME
+            record.updated_at = datetime.utcnow()
+            session.commit()
+            return True
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _wrap(self, password: str, data_key: bytes):
+        salt = os.urandom(SALT_SIZE)
+        kek = AESHandler(self.kdf(password, salt))
+        return salt, kek.encrypt_envelope(data_key, WRAP_CONTEXT)
+
+    def _unwrap(self, record: KeyStoreRecord, password: str) -> bytes:
+        kek = AESHandler(self.kdf(password, record.salt))
+        try:
+            return kek.decrypt_envelope(record.wrapped_key, WRAP_CONTEXT)
+        except ValueError:
+            raise ValueError("Invalid password")
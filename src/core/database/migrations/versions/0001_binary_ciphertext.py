@@ -0,0 +1,52 @@
+"""Store block ciphertext as a binary envelope instead of base64 text
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+import base64
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENVELOPE_VERSION = 1
+BATCH_SIZE = 1000
+
+def upgrade():
+    bind = op.get_bind()
+    if 'blocks' not in sa.inspect(bind).get_table_names():
+        # Fresh database: create_all builds the table with the binary column
+        return
+
+    _convert(bind, "text", lambda value: bytes([ENVELOPE_VERSION]) + base64.b64decode(value))
+    with op.batch_alter_table('blocks') as batch_op:
+        batch_op.alter_column('encrypted_data', type_=sa.LargeBinary(),
+                              existing_type=sa.Text(), existing_nullable=False)
+
+def downgrade():
+    bind = op.get_bind()
+    _convert(bind, "blob", lambda value: base64.b64encode(value[1:]).decode('ascii'))
+    with op.batch_alter_table('blocks') as batch_op:
+        batch_op.alter_column('encrypted_data', type_=sa.Text(),
+                              existing_type=sa.LargeBinary(), existing_nullable=False)
+
+def _convert(bind, stored_type, convert):
+    """Rewrite encrypted_data in id order, one bounded batch at a time"""
+    select = sa.text(
+        "SELECT id, encrypted_data FROM blocks "
+        "WHERE id > :last_id AND typeof(encrypted_data) = :stored_type "
+        "ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE blocks SET encrypted_data = :data WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = bind.execute(select, {"last_id": last_id, "stored_type": stored_type, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(update, [{"id": row.id, "data": convert(row.encrypted_data)} for row in rows])
+        last_id = rows[-1].id
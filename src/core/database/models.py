@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, MetaData, String, Text, DateTime
+from sqlalchemy import Column, Integer, LargeBinary, MetaData, String, DateTime, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 
@@ -13,9 +13,95 @@ class BlockModel(Base):
     id = Column(Integer, primary_key=True)
     index = Column(Integer, unique=True, nullable=False)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
-    encrypted_data = Column(Text, nullable=False)
+    encrypted_data = Column(LargeBinary, nullable=False)
     previous_hash = Column(String(64), nullable=False)
     current_hash = Column(String(64), unique=True, nullable=False)
     
     def __repr__(self):
-        return f"<Block(index={self.index}, hash={self.current_hash[:8]}...)>"
\ No newline at end of file
+        return f"<Block(index={self.index}, hash={self.current_hash[:8]}...)>"
+
+
+class ValidationCheckpoint(Base):
+    __tablename__ = 'validation_checkpoints'
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(Integer, primary_key=True)
+    verified_index = Column(Integer, nullable=False)
+    verified_hash = Column(String(64), nullable=False)
+    verified_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ValidationCheckpoint(index={self.verified_index}, hash={self.verified_hash[:8]}...)>"
+
+
+class BlockState(Base):
+    """Plaintext index of blocks that no longer hold a live note.
+
+    Every row is backed by an encrypted block in the chain (`recorded_in`),
+    so the table can always be rebuilt from the chain itself.
+    """
+    __tablename__ = 'block_states'
+    __table_args__ = {'extend_existing': True}
+    
+    DELETED = 'deleted'
+    SUPERSEDED = 'superseded'
+    TOMBSTONE = 'tombstone'
+    
+    block_index = Column(Integer, primary_key=True)
+    state = Column(String(16), nullable=False)
+    recorded_in = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<BlockState(index={self.block_index}, state={self.state}, recorded_in={self.recorded_in})>"
+
+
+class KeyStoreRecord(Base):
+    """Data-encryption key wrapped by the password-derived key; always the single row with id 1"""
+    __tablename__ = 'keystore'
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    kdf = Column(String(32), nullable=False)
+    salt = Column(LargeBinary, nullable=False)
+    wrapped_key = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<KeyStoreRecord(kdf={self.kdf}, updated_at={self.updated_at})>"
+
+
+class MerkleCheckpoint(Base):
+    """Merkle root over the hashes of one sealed range of blocks"""
+    __tablename__ = 'merkle_checkpoints'
+    __table_args__ = {'extend_existing': True}
+    
+    range_start = Column(Integer, primary_key=True)
+    range_end = Column(Integer, nullable=False, unique=True)
+    root = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<MerkleCheckpoint(range={self.range_start}-{self.range_end}, root={self.root[:8]}...)>"
+
+
+class NoteRevision(Base):
+    """Plaintext map from a note to the blocks holding its revisions.
+
+    A note's stable ID is the index of the block that created it, so
+    revision 0 has block_index == note_id. Like block_states, the table
+    can be rebuilt from the `updated_from` links inside the chain.
+    """
+    __tablename__ = 'note_revisions'
+    __table_args__ = (
+        UniqueConstraint('note_id', 'revision', name='uq_note_revisions_note_id_revision'),
+        {'extend_existing': True}
+    )
+    
+    block_index = Column(Integer, primary_key=True)
+    note_id = Column(Integer, nullable=False)
+    revision = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<NoteRevision(note_id={self.note_id}, revision={self.revision}, block_index={self.block_index})>"
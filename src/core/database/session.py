@@ -1,13 +1,53 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 from .models import Base
+from ..metrics import instrument_engine
 import os
 import atexit
+import threading
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+PROFILE_ENV_VAR = "CRYPTONOTE_DB_PROFILE"
+DEFAULT_PROFILE = "balanced"
+
+# SQLite PRAGMAs applied to every new connection; cache_size < 0 is in KiB
+PROFILES = {
+    # Every commit is synced to disk before it returns
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000
+    },
+    # WAL only syncs at checkpoints: safe against crashes, may lose the last commits on power loss
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    },
+    # For one-off imports that can be re-run if the machine goes down mid-way
+    "bulk-import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000
+    }
+}
 
 class DatabaseManager:
-    def __init__(self, db_path="data/database.db"):
+    def __init__(self, db_path="data/database.db", profile=None):
         self.db_path = db_path
+        self.profile = self._resolve_profile(profile or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE)
         self.engine = create_engine(f"sqlite:///{db_path}")
+        event.listen(self.engine, "connect", self._apply_profile)
+        instrument_engine(self.engine)
         self.session_factory = sessionmaker(bind=self.engine)
         self.Session = scoped_session(self.session_factory)
         self.Base = Base
@@ -15,9 +55,42 @@ class DatabaseManager:
         atexit.register(self.close)  # Ensure cleanup on exit
 
     def _init_db(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._run_migrations()
         self.Base.metadata.create_all(self.engine)
 
+    def _run_migrations(self):
+        """Bring an existing database schema up to date with Alembic"""
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_DIR)
+        with self.engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+
+    @staticmethod
+    def _resolve_profile(name):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown database profile '{name}', expected one of: {', '.join(PROFILES)}")
+        return name
+
+    def _apply_profile(self, dbapi_connection, connection_record):
+        """Apply the active profile's PRAGMAs to a new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in PROFILES[self.profile].items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
+
+    def use_profile(self, name):
+        """Switch to another profile; pooled connections are dropped so new ones pick it up"""
+        self.profile = self._resolve_profile(name)
+        self.Session.remove()
+        self.engine.dispose()
+
     def get_session(self):
         return self.Session()
 
@@ -25,4 +98,20 @@ class DatabaseManager:
         self.Session.remove()
         self.engine.dispose()
 
-db_manager = DatabaseManager()
\ No newline at end of file
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """Shared DatabaseManager, created (with its engine and migrations) on first use"""
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
+    return _db_manager
+
+def __getattr__(name):
+    # `db_manager` used to be built at import time; resolve it on first access instead
+    if name == "db_manager":
+        return get_db_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""In-process counters and latency histograms.
+
+Collection is off unless CRYPTONOTE_METRICS is set (or `metrics.enable()`
+is called); while off, instrumented calls cost one attribute check.
+"""
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Optional
+import functools
+import json
+import os
+import re
+
+METRICS_ENV_VAR = "CRYPTONOTE_METRICS"
+# Upper bounds of the latency buckets, in seconds; slower calls land in an overflow bucket
+BUCKET_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_STATEMENT_LENGTH = 120
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round((self.min or 0.0) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "buckets": {
+                (f"<={bound * 1000:g}ms" if i < len(BUCKET_BOUNDS) else f">{BUCKET_BOUNDS[-1] * 1000:g}ms"): count
+                for i, (bound, count) in enumerate(zip(BUCKET_BOUNDS + (None,), self.buckets)) if count
+            }
+        }
+
+class MetricsRegistry:
+    """Thread-safe store of counters, operation timers and SQL statement timers"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, int] = {}
+            self.timers: Dict[str, Histogram] = {}
+            self.sql: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.timers.setdefault(name, Histogram()).observe(seconds)
+
+    def observe_sql(self, statement: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.sql.setdefault(normalize_statement(statement), Histogram()).observe(seconds)
+
+    def snapshot(self) -> dict:
+        """Copy of every metric as plain JSON-ready data"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "counters": dict(self.counters),
+                "timers": {name: histogram.to_dict() for name, histogram in self.timers.items()},
+                "sql": {statement: histogram.to_dict() for statement, histogram in self.sql.items()}
+            }
+
+    def dump_json(self, path: str, extra: Optional[dict] = None):
+        """Write a snapshot, plus any extra sections, to a JSON file"""
+        snapshot = self.snapshot()
+        snapshot.update(extra or {})
+        with open(path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+
+metrics = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR, "").lower() in ("1", "true", "yes", "on"))
+
+def timed(name: str) -> Callable:
+    """Record the latency of every call, and failed calls under "<name>.errors" """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.increment(f"{name}.errors")
+                raise
+            finally:
+                metrics.observe(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and expanded IN lists so one query shape is one metric"""
+    statement = re.sub(r"\s+", " ", statement).strip()
+    statement = re.sub(r"\(\?(?:, \?)+\)", "(?, ...)", statement)
+    if len(statement) > SQL_STATEMENT_LENGTH:
+        statement = statement[:SQL_STATEMENT_LENGTH - 3] + "..."
+    return statement
+
+def instrument_engine(engine):
+    """Time every SQL statement executed through an engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if metrics.enabled:
+            conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            metrics.observe_sql(statement, perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+            metrics.increment("sql.errors")
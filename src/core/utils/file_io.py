@@ -1,23 +1,235 @@
 import json
+import mmap
+import struct
+from array import array
+from collections.abc import Iterator as IteratorABC
 from pathlib import Path
-from typing import Any
-from ..crypto.aes_handler import AESHandler
+from typing import Any, Iterator
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+from ..crypto.aes_handler import AESHandler, TAG_SIZE
+
+CONTAINER_MAGIC = b"CNSEG001"
+FOOTER_MAGIC = b"CNSEGEND"
+DEFAULT_SEGMENT_SIZE = 64 * 1024
+NONCE_PREFIX_SIZE = 8
+INDEX_SEGMENT = 0xFFFFFFFF
+KIND_DOCUMENT = 0
+KIND_RECORDS = 1
+# magic | segment size | kind | user header length
+FIXED_HEADER = struct.Struct(">8sIBH")
+# index offset | index length | magic
+FOOTER = struct.Struct(">QI8s")
 
 class SecureFileHandler:
-    def __init__(self, crypto_handler: AESHandler):
+    """Encrypted JSON files in a segmented, random-access container.
+
+    Layout: header | segments | encrypted record index | footer. The JSON
+    stream is cut into fixed-size segments, each its own AES-GCM message
+    whose nonce and associated data carry the segment number (and, for
+    the last one, a final flag), so segments cannot be reordered, dropped
+    or truncated unnoticed. Every segment has the same size on disk, so
+    any one can be located by arithmetic and decrypted on its own; the
+    index maps record numbers to byte offsets in the stream.
+    """
+
+    def __init__(self, crypto_handler: AESHandler, segment_size: int = DEFAULT_SEGMENT_SIZE):
         self.crypto = crypto_handler
+        self.segment_size = segment_size
+
+    def save_encrypted(self, path: str, data: Any, header: bytes = b"") -> int:
+        """ذخیره داده با فرمت JSON رمزنگاری شده
 
-    def save_encrypted(self, path: str, data: Any):
-        """ذخیره داده با فرمت JSON رمزنگاری شده"""
+        A generator or other iterator is streamed as one record per item;
+        anything else is stored as a single JSON document. Returns the
+        number of records written.
+        """
         Path(path).parent.mkdir(exist_ok=True, parents=True)
-        encrypted = self.crypto.encrypt(json.dumps(data))
-        with open(path, 'w') as f:
-            f.write(encrypted)
+        if isinstance(data, IteratorABC):
+            kind, records = KIND_RECORDS, data
+        else:
+            kind, records = KIND_DOCUMENT, iter([data])
+
+        with open(path, 'wb') as f:
+            writer = _SegmentWriter(self.crypto.key, f, self.segment_size, kind, header)
+            for record in records:
+                writer.write_record((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+            return writer.close()
 
     def load_encrypted(self, path: str) -> Any:
         """بارگذاری و رمزگشایی داده"""
         try:
-            with open(path, 'r') as f:
-                return json.loads(self.crypto.decrypt(f.read()))
+            with open(path, 'rb') as f:
+                magic = f.read(len(CONTAINER_MAGIC))
+            if magic != CONTAINER_MAGIC:
+                return self._load_legacy(path)
+            with self.open(path) as container:
+                if container.kind == KIND_DOCUMENT:
+                    return container.read_record(0)
+                return list(container.iter_records())
         except (FileNotFoundError, json.JSONDecodeError):
-            return None
\ No newline at end of file
+            return None
+
+    def _load_legacy(self, path: str) -> Any:
+        """Files written before the container: one base64 AES-GCM message"""
+        with open(path, 'r') as f:
+            return json.loads(self.crypto.decrypt(f.read()))
+
+    def open(self, path: str) -> "EncryptedContainer":
+        """Open a container for streaming or random-access reads"""
+        return EncryptedContainer(self.crypto.key, path)
+
+    def iter_records(self, path: str) -> Iterator[Any]:
+        """Stream the records of a container one at a time"""
+        with self.open(path) as container:
+            yield from container.iter_records()
+
+    def read_record(self, path: str, number: int) -> Any:
+        """Read one record, decrypting only the segments it spans"""
+        with self.open(path) as container:
+            return container.read_record(number)
+
+    @staticmethod
+    def read_header(path: str) -> bytes:
+        """Read the caller-supplied plaintext header of a container"""
+        with open(path, 'rb') as f:
+            magic, _, _, length = FIXED_HEADER.unpack(f.read(FIXED_HEADER.size))
+            if magic != CONTAINER_MAGIC:
+                raise ValueError("Not an encrypted container")
+            return f.read(length)
+
+def _segment_cipher(key: bytes, nonce_prefix: bytes, number: int, header: bytes, final: bool):
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce_prefix + struct.pack(">I", number))
+    cipher.update(header + struct.pack(">I?", number, final))
+    return cipher
+
+class _SegmentWriter:
+    """Write a plaintext stream as fixed-size authenticated segments"""
+
+    def __init__(self, key: bytes, f, segment_size: int, kind: int, user_header: bytes):
+        self.key = key
+        self.f = f
+        self.segment_size = segment_size
+        nonce_prefix = get_random_bytes(NONCE_PREFIX_SIZE)
+        self.header = FIXED_HEADER.pack(CONTAINER_MAGIC, segment_size, kind, len(user_header)) + user_header + nonce_prefix
+        self.nonce_prefix = nonce_prefix
+        self.f.write(self.header)
+        self.buffer = bytearray()
+        self.offsets = array('Q')
+        self.position = 0
+        self.segments = 0
+
+    def write_record(self, data: bytes):
+        self.offsets.append(self.position)
+        self.position += len(data)
+        self.buffer += data
+        # Keep at least one byte buffered so the last segment is written by close()
+        while len(self.buffer) > self.segment_size:
+            self._write_segment(bytes(self.buffer[:self.segment_size]), final=False)
+            del self.buffer[:self.segment_size]
+
+    def close(self) -> int:
+        self._write_segment(bytes(self.buffer), final=True)
+        index_offset = self.f.tell()
+        cipher = _segment_cipher(self.key, self.nonce_prefix, INDEX_SEGMENT, self.header, True)
+        ciphertext, tag = cipher.encrypt_and_digest(struct.pack(">Q", self.position) + self.offsets.tobytes())
+        self.f.write(ciphertext + tag)
+        self.f.write(FOOTER.pack(index_offset, len(ciphertext) + TAG_SIZE, FOOTER_MAGIC))
+        return len(self.offsets)
+
+    def _write_segment(self, plaintext: bytes, final: bool):
+        cipher = _segment_cipher(self.key, self.nonce_prefix, self.segments, self.header, final)
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        self.f.write(ciphertext + tag)
+        self.segments += 1
+
+class EncryptedContainer:
+    """Memory-mapped reader for the segmented container"""
+
+    def __init__(self, key: bytes, path: str):
+        self.key = key
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        magic, self.segment_size, self.kind, length = FIXED_HEADER.unpack_from(self._map, 0)
+        if magic != CONTAINER_MAGIC:
+            raise ValueError("Not an encrypted container")
+        header_end = FIXED_HEADER.size + length + NONCE_PREFIX_SIZE
+        self.user_header = self._map[FIXED_HEADER.size:FIXED_HEADER.size + length]
+        self.nonce_prefix = self._map[header_end - NONCE_PREFIX_SIZE:header_end]
+        self.header = self._map[:header_end]
+        self.data_start = header_end
+
+        index_offset, index_length, footer_magic = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if footer_magic != FOOTER_MAGIC:
+            raise ValueError("Encrypted container is truncated")
+        stored = self._map[index_offset:index_offset + index_length]
+        cipher = _segment_cipher(self.key, self.nonce_prefix, INDEX_SEGMENT, self.header, True)
+        index = cipher.decrypt_and_verify(stored[:-TAG_SIZE], stored[-TAG_SIZE:])
+        (self.stream_length,) = struct.unpack_from(">Q", index, 0)
+        self.offsets = array('Q')
+        self.offsets.frombytes(index[8:])
+
+        stored_segment = self.segment_size + TAG_SIZE
+        self.segment_count = max(1, -(-self.stream_length // self.segment_size))
+        if self.data_start + (self.segment_count - 1) * stored_segment + TAG_SIZE > index_offset:
+            raise ValueError("Encrypted container is truncated")
+
+    @property
+    def record_count(self) -> int:
+        return len(self.offsets)
+
+    def read_segment(self, number: int) -> bytes:
+        """Decrypt and verify one segment"""
+        if not 0 <= number < self.segment_count:
+            raise IndexError(f"Segment {number} out of range")
+        stored_segment = self.segment_size + TAG_SIZE
+        start = self.data_start + number * stored_segment
+        final = number == self.segment_count - 1
+        length = (self.stream_length - number * self.segment_size) + TAG_SIZE if final else stored_segment
+        stored = self._map[start:start + length]
+        cipher = _segment_cipher(self.key, self.nonce_prefix, number, self.header, final)
+        return cipher.decrypt_and_verify(stored[:-TAG_SIZE], stored[-TAG_SIZE:])
+
+    def read_range(self, start: int, end: int) -> bytes:
+        """Decrypt the plaintext bytes [start, end) of the stream"""
+        first, last = start // self.segment_size, max(start, end - 1) // self.segment_size
+        data = b"".join(self.read_segment(number) for number in range(first, last + 1))
+        offset = first * self.segment_size
+        return data[start - offset:end - offset]
+
+    def read_record(self, number: int) -> Any:
+        """Decrypt only the segments holding one record"""
+        if not 0 <= number < len(self.offsets):
+            raise IndexError(f"Record {number} out of range")
+        start = self.offsets[number]
+        end = self.offsets[number + 1] if number + 1 < len(self.offsets) else self.stream_length
+        return json.loads(self.read_range(start, end))
+
+    def iter_records(self) -> Iterator[Any]:
+        """Stream every record, decrypting one segment at a time"""
+        remainder = b""
+        for number in range(self.segment_count):
+            *complete, remainder = (remainder + self.read_segment(number)).split(b"\n")
+            for line in complete:
+                yield json.loads(line)
+        if remainder.strip():
+            yield json.loads(remainder)
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,17 +6,16 @@ from os.path import dirname, abspath
 project_root = dirname(dirname(dirname(dirname(abspath(__file__)))))
 sys.path.insert(0, project_root)
 
-from src.core.database.session import db_manager
-from src.core.blockchain.chain import Blockchain
-from src.core.crypto.aes_handler import AESHandler
+from src.core.database.session import get_db_manager
+import src.core.blockchain.block  # noqa: F401  (registers the blocks table)
 
 def init_db():
+    db_manager = get_db_manager()
     try:
         db_manager.Base.metadata.drop_all(db_manager.engine)
         db_manager.Base.metadata.create_all(db_manager.engine)
-        
-        crypto = AESHandler(b'\x00'*32)
-        blockchain = Blockchain(crypto, db_manager)  # Pass db_manager
+        # The keystore and genesis block are created on first unlock,
+        # encrypted with a fresh random data key
         print("✅ Database initialized successfully!")
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
@@ -0,0 +1,81 @@
+"""Measure where application startup time goes.
+
+The profiler re-runs the application in a child interpreter started with
+`-X importtime`. The child reports milestones (see `mark`) on stderr and
+exits as soon as its window first paints. The parent then prints each
+milestone's offset from process start and the slowest imports.
+"""
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import os
+import subprocess
+import sys
+import time
+
+MARK_PREFIX = "startup-mark\t"
+IMPORT_PREFIX = "import time:"
+CHILD_TIMEOUT = 60
+
+def mark(label: str):
+    """Report a startup milestone to the profiling parent"""
+    sys.stderr.write(f"{MARK_PREFIX}{label}\t{time.time()!r}\n")
+    sys.stderr.flush()
+
+def parse_importtime(lines: List[str]) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for each `-X importtime` line"""
+    imports = []
+    for line in lines:
+        if not line.startswith(IMPORT_PREFIX):
+            continue
+        fields = line[len(IMPORT_PREFIX):].split("|")
+        try:
+            imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+        except (IndexError, ValueError):
+            # The header line
+            continue
+    return imports
+
+def parse_marks(lines: List[str], started: float) -> List[Tuple[str, float]]:
+    """(label, seconds since the child was spawned) for each milestone"""
+    marks = []
+    for line in lines:
+        if line.startswith(MARK_PREFIX):
+            label, timestamp = line[len(MARK_PREFIX):].rsplit("\t", 1)
+            marks.append((label, float(timestamp) - started))
+    return marks
+
+def format_report(marks: List[Tuple[str, float]], imports: List[Tuple[str, int, int]], top: int = 20) -> str:
+    lines = ["Milestones (ms since process start):"]
+    lines += [f"  {label:<24}{seconds * 1000:>10.1f}" for label, seconds in marks]
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for module, self_us, _ in imports:
+        by_package[module.split(".")[0]] += self_us
+    lines.append(f"Import time by top-level package (ms, {len(imports)} modules):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {package:<32}{self_us / 1000:>10.1f}")
+
+    lines.append("Slowest modules (cumulative ms / self ms):")
+    for module, self_us, cumulative_us in sorted(imports, key=lambda item: -item[2])[:top]:
+        lines.append(f"  {module:<48}{cumulative_us / 1000:>10.1f}{self_us / 1000:>10.1f}")
+    return "\n".join(lines)
+
+def profile_startup(script: str, child_args: List[str]) -> int:
+    """Run `script` in a profiled child and print the report; returns the child's exit status"""
+    started = time.time()
+    try:
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", script, *child_args],
+            stderr=subprocess.PIPE, text=True, timeout=CHILD_TIMEOUT, env=os.environ.copy()
+        )
+    except subprocess.TimeoutExpired:
+        print(f"Startup profile: no first paint within {CHILD_TIMEOUT} seconds", file=sys.stderr)
+        return 1
+
+    lines = child.stderr.splitlines()
+    marks = parse_marks(lines, started)
+    if not marks:
+        # Something went wrong before the first milestone; show what the child said
+        print("\n".join(line for line in lines if not line.startswith(IMPORT_PREFIX)), file=sys.stderr)
+    print(format_report(marks, parse_importtime(lines)))
+    return child.returncode